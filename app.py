@@ -1,15 +1,61 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 
 from routers import holidays as holidays_router
 from routers import top100 as top100_router
 from routers import analysis as analysis_router
+from routers import ohlcv as ohlcv_router
+from routers import metrics as metrics_router
+from routers import health as health_router
+from services.metrics_service import SamplingProfiler, request_latency, save_profile
+from services.parallel_service import shutdown_pool
+from services.warmup_service import start_warmup
+
+@asynccontextmanager
+async def lifespan(app):
+    # 티커 인덱스·영업일 달력 등은 요청 처리를 막지 않도록 백그라운드에서 준비합니다 (진행 상황은 /health).
+    start_warmup()
+    yield
+    shutdown_pool()
+    holidays_router.stop_holiday_listener()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(holidays_router.router)
 app.include_router(top100_router.router)
 app.include_router(analysis_router.router)
+app.include_router(ohlcv_router.router)
+app.include_router(metrics_router.router)
+app.include_router(health_router.router)
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """요청 처리 시간을 라우트별로 기록하고, X-Profile 헤더나 profile=1 요청은 샘플링 프로파일을 남깁니다."""
+    profiler = None
+    if request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1":
+        profiler = SamplingProfiler()
+        profiler.start()
+
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        if profiler is None:
+            response = await call_next(request)
+        else:
+            with profiler.activate():
+                response = await call_next(request)
+        status = response.status_code
+    finally:
+        duration = time.perf_counter() - started_at
+        route = request.scope.get("route")
+        # 매칭되지 않은 경로는 레이블 수가 늘어나지 않도록 하나로 묶습니다.
+        request_latency.observe(duration, request.method, route.path if route else "unmatched", str(status))
+        if profiler is not None:
+            profiler.stop()
+            profile_id = save_profile(request.method, request.url.path, duration, profiler)
+
+    if profiler is not None:
+        response.headers["X-Profile-Id"] = str(profile_id)
+    return response
 
-# 앱 시작 시 티커 맵 로드
-# @app.on_event("startup")
-# async def startup_event():
-#     load_ticker_map()
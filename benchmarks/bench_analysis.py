@@ -0,0 +1,77 @@
+"""눌림목 판정(check_pullback, 전 종목 스캔) 벤치마크."""
+import json
+import os
+
+from routers.analysis import check_pullback
+from services.indicator_service import IndicatorState, save_state
+from services.pullback_service import scan_pullback
+from services.stock_service import get_market_ohlcv
+
+# 증분 갱신 시나리오에서 저장된 상태가 뒤처져 있는 거래일 수
+STALE_BARS = 5
+
+
+def _remove_state(ticker: str):
+    import services.indicator_service as indicator_service
+    path = os.path.join(indicator_service.INDICATOR_STATE_DIR, f"{ticker}.json")
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_check_pullback_remote(benchmark, krx, reference_date):
+    """로컬 저장소와 지표 상태가 없어 pykrx 기간 조회로 전체 구간을 계산하는 경우."""
+    ticker = krx.tickers[0]
+    result = benchmark.pedantic(check_pullback, args=(ticker, reference_date), setup=lambda: _remove_state(ticker), rounds=20)
+    assert "reason" not in result or "오류" not in result["reason"]
+
+
+def test_check_pullback_local_store(benchmark, local_store, krx, reference_date):
+    """로컬 시세 저장소의 파티션으로 전체 구간을 계산하는 경우 (종목 수만큼 파티션이 커집니다)."""
+    ticker = krx.tickers[0]
+    result = benchmark.pedantic(check_pullback, args=(ticker, reference_date), setup=lambda: _remove_state(ticker), rounds=20)
+    assert "details" in result
+
+
+def test_check_pullback_incremental(benchmark, local_store, krx, reference_date):
+    """STALE_BARS 거래일 뒤처진 지표 상태를 증분 갱신하는 경우."""
+    ticker = krx.tickers[0]
+    history = get_market_ohlcv(ticker, krx.dates[0], krx.dates[-1 - STALE_BARS])
+    stale_state = IndicatorState.from_history(ticker, history).to_dict()
+
+    def setup():
+        save_state(IndicatorState.from_dict(stale_state))
+
+    result = benchmark.pedantic(check_pullback, args=(ticker, reference_date), setup=setup, rounds=50)
+    assert "details" in result
+
+
+def test_check_pullback_incremental_matches_full(krx, reference_date):
+    """처음 호출(전체 구간 계산)과 이후 호출(저장 상태 재사용·증분 갱신)의 결과가 같고 JSON으로 직렬화되는지 확인합니다."""
+    for ticker in krx.tickers[:10]:
+        _remove_state(ticker)
+        first = check_pullback(ticker, reference_date)
+        assert "details" in first
+        json.dumps(first)
+
+        assert check_pullback(ticker, reference_date) == first
+
+        history = get_market_ohlcv(ticker, krx.dates[0], krx.dates[-1 - STALE_BARS])
+        save_state(IndicatorState.from_history(ticker, history))
+        assert check_pullback(ticker, reference_date) == first
+
+
+def test_scan_pullback(benchmark, local_store, reference_date):
+    """로컬 저장소의 전 종목을 한 번에 판정하는 경우."""
+    results = benchmark(scan_pullback, reference_date)
+    assert results
+
+
+def test_intraday_preview(benchmark, krx, reference_date):
+    """전 영업일 마감 봉 상태를 고정해 두고 장중 체결 시세 하나로 당일 봉을 다시 판정하는 경우."""
+    ticker = krx.tickers[0]
+    history = get_market_ohlcv(ticker, krx.dates[0], krx.dates[-2])
+    preview = IndicatorState.from_history(ticker, history).preview(reference_date)
+    close, volume = history['종가'].iloc[-1].item(), history['거래량'].iloc[-1].item()
+
+    result = benchmark(preview.evaluate, close, volume)
+    assert "details" in result
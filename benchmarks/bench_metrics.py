@@ -0,0 +1,56 @@
+"""요청 프로파일(X-Profile) 샘플링 대상 검사."""
+import threading
+import time
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.metrics_service import ProfiledRoute, SamplingProfiler
+
+
+def _spin_request(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _spin_other(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_samples_only_request_thread():
+    """프로파일에는 요청을 처리한 스레드의 스택만 들어가고, 동시에 돌던 다른 스레드의 스택은 섞이지 않는지 확인합니다."""
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/busy")
+    def busy(seconds: float = 0.2):
+        _spin_request(seconds)
+        return {"seconds": seconds}
+
+    app = FastAPI()
+    app.include_router(router)
+    profilers = []
+
+    @app.middleware("http")
+    async def profile(request: Request, call_next):
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        with profiler.activate():
+            response = await call_next(request)
+        profiler.stop()
+        profilers.append(profiler)
+        return response
+
+    other = threading.Thread(target=_spin_other, args=(0.5,))
+    other.start()
+    try:
+        response = TestClient(app).get("/busy", params={"seconds": 0.2})
+    finally:
+        other.join()
+
+    assert response.json() == {"seconds": 0.2}
+    stacks = profilers[0].stacks
+    assert any("_spin_request" in stack for stack in stacks)
+    assert not any("_spin_other" in stack for stack in stacks)
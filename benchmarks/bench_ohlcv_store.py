@@ -0,0 +1,47 @@
+"""로컬 시세 저장소의 휴장일 처리 검사.
+
+영업일 달력에는 없지만 KRX가 열리지 않은 날(연말 휴장일 등)에 pykrx는 빈 테이블이나 가격이 모두 0인 테이블을 돌려줍니다.
+이런 날은 한 번만 조회해 휴장일로 기록하고, 시세 행렬과 단일 종목 이력에서는 빠져야 합니다.
+"""
+import pytest
+
+from services.ohlcv_store import OHLC_COLUMNS, load_price_matrix, load_ticker_history
+
+# 조회 구간 (check_pullback의 조회 구간과 비슷한 길이)
+WINDOW_DAYS = 70
+
+
+@pytest.mark.parametrize("holiday_table", ["empty", "zeros"])
+def test_market_holiday_is_recorded_once(krx, monkeypatch, holiday_table):
+    from pykrx import stock
+
+    window = krx.dates[-WINDOW_DAYS:]
+    closed_date = window[-10]
+    calls = []
+
+    def get_market_ohlcv_by_ticker(date, market="KOSPI", **kwargs):
+        calls.append(date)
+        df = krx.get_market_ohlcv_by_ticker(date, market)
+        if date != closed_date:
+            return df
+        if holiday_table == "empty":
+            return df.iloc[0:0]
+        df[list(OHLC_COLUMNS)] = 0
+        return df
+
+    monkeypatch.setattr(stock, 'get_market_ohlcv_by_ticker', get_market_ohlcv_by_ticker)
+
+    close = load_price_matrix(window)['종가']
+    assert len(close) == WINDOW_DAYS - 1
+    assert closed_date not in close.index.strftime('%Y%m%d')
+    assert (close.to_numpy() > 0).all()
+
+    # 휴장일도 기록되어 있으므로 다시 읽을 때 KRX를 호출하지 않습니다.
+    calls.clear()
+    load_price_matrix(window)
+    assert calls == []
+
+    history = load_ticker_history(krx.tickers[0], window)
+    assert history is not None
+    assert len(history) == WINDOW_DAYS - 1
+    assert closed_date not in history.index.strftime('%Y%m%d')
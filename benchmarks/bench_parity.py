@@ -0,0 +1,102 @@
+"""눌림목 판정 구현 간 일치 여부 검사.
+
+check_pullback(단일 종목), compute_pullback_signals(전 종목 벡터 계산), IndicatorState(증분 상태),
+IntradayPreview(장중 당일 봉 판정)가 같은 합성 시세에 대해 조건별로 같은 결과를 내는지 확인합니다.
+"""
+import math
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import services.indicator_service as indicator_service
+from routers.analysis import check_pullback
+from services.indicator_service import IndicatorState
+from services.pullback_service import LOOKBACK_CALENDAR_DAYS, compute_pullback_signals
+from services.stock_service import get_market_ohlcv
+
+# 비교할 종목 수와 기준일 수 (합성 시장의 앞쪽 종목, 마지막 거래일들)
+PARITY_TICKERS = 40
+PARITY_DATES = 12
+
+CONDITIONS = {
+    "조건1_정배열": "cond_aligned",
+    "조건2_ma20상승기울기": "cond_rising",
+    "조건3_최근상승이력(고점기준)": "cond_recent_high",
+    "조건4_ma20근접": "cond_near_ma20",
+    "조건5_거래량감소": "cond_volume_decreased",
+}
+VALUES = {
+    "종가": "close",
+    "ma5": "ma5",
+    "ma20": "ma20",
+    "ma60": "ma60",
+    "최근3일평균거래량": "avg_vol_3",
+    "상승시평균거래량": "avg_vol_rise",
+}
+
+
+def _window_start(date_str: str) -> str:
+    # check_pullback과 같은 조회 구간(기준일 이전 LOOKBACK_CALENDAR_DAYS 달력일)을 모든 구현에 똑같이 줍니다.
+    return (datetime.strptime(date_str, '%Y%m%d') - timedelta(days=LOOKBACK_CALENDAR_DAYS)).strftime('%Y%m%d')
+
+
+def _signal_details(signals: dict, col: int) -> dict:
+    return {
+        **{name: bool(signals[key][-1, col]) for name, key in CONDITIONS.items()},
+        **{name: float(signals[key][-1, col]) for name, key in VALUES.items()},
+    }
+
+
+def _assert_same(expected: dict, actual: dict, label: str):
+    for name in CONDITIONS:
+        assert expected[name] == actual[name], f"{label}: {name} {expected[name]} != {actual[name]}"
+    for name in VALUES:
+        assert math.isclose(expected[name], actual[name], rel_tol=1e-9, abs_tol=1e-6), \
+            f"{label}: {name} {expected[name]} != {actual[name]}"
+
+
+def test_pullback_implementations_agree(krx):
+    """네 구현의 조건별 판정과 지표 값이 모든 (종목, 기준일) 조합에서 같은지 확인합니다."""
+    dates = np.array([np.datetime64(datetime.strptime(date, '%Y%m%d').date(), 'D') for date in krx.dates])
+    tickers = krx.tickers[:PARITY_TICKERS]
+    cols = [int(ticker) for ticker in tickers]
+    seen = {name: set() for name in CONDITIONS}
+    compared = 0
+
+    for t in range(len(krx.dates) - PARITY_DATES, len(krx.dates)):
+        date_str = krx.dates[t]
+        rows = slice(int(np.searchsorted(krx.dates, _window_start(date_str))), t + 1)
+        signals = compute_pullback_signals(
+            dates[rows], krx._close[rows][:, cols].astype(float), krx._volume[rows][:, cols].astype(float)
+        )
+
+        for col, ticker in enumerate(tickers):
+            label = f"{ticker}@{date_str}"
+            vectorized = _signal_details(signals, col)
+
+            state_path = os.path.join(indicator_service.INDICATOR_STATE_DIR, f"{ticker}.json")
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            single = check_pullback(ticker, date_str)
+            assert "details" in single, f"{label}: {single}"
+
+            history = get_market_ohlcv(ticker, _window_start(date_str), date_str)
+            incremental = IndicatorState.from_history(ticker, history).evaluate(date_str)
+
+            closed_bars = IndicatorState.from_history(ticker, history.iloc[:-1])
+            close, volume = history['종가'].iloc[-1].item(), history['거래량'].iloc[-1].item()
+            intraday = closed_bars.preview(date_str).evaluate(close, volume)
+
+            for name, result in (("check_pullback", single), ("IndicatorState", incremental), ("IntradayPreview", intraday)):
+                _assert_same(vectorized, result["details"], f"{label} {name}")
+                assert result["is_pullback"] == bool(signals["is_pullback"][-1, col]), f"{label} {name}"
+                assert result["score"] == float(signals["score"][-1, col]), f"{label} {name}"
+
+            for name in CONDITIONS:
+                seen[name].add(vectorized[name])
+            compared += 1
+
+    assert compared == PARITY_TICKERS * PARITY_DATES
+    # 합성 시세가 모든 조건의 참·거짓을 모두 만들어 비교가 의미 있는지 확인합니다.
+    assert all(values == {True, False} for values in seen.values()), seen
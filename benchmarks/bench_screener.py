@@ -0,0 +1,24 @@
+"""스크리너(조건식 해석과 전 종목 지표 테이블 필터링) 벤치마크."""
+import pytest
+
+from services.screener_service import get_indicator_table, indicator_table_cache, parse_query, screen
+
+# README 예시와 같은 형태의 대표 조건식
+QUERY = "ma5>ma20>ma60 AND close within 2% of ma20 AND value_rank<=200"
+
+
+def test_parse_query(benchmark):
+    """조건식을 조건 트리로 해석하는 경우."""
+    node = benchmark(parse_query, QUERY)
+    assert node[0] == "and"
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["cold", "cached"])
+def test_screen(benchmark, local_store, reference_date, cached):
+    """로컬 시세 저장소의 전 종목을 조건식으로 거르는 경우 (cold는 지표 테이블 계산 포함)."""
+    if cached:
+        get_indicator_table(reference_date)
+        result = benchmark(screen, reference_date, QUERY)
+    else:
+        result = benchmark.pedantic(screen, args=(reference_date, QUERY), setup=indicator_table_cache.clear, rounds=10)
+    assert result is not None
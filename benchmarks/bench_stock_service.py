@@ -0,0 +1,30 @@
+"""영업일 계산(get_previous_business_days) 벤치마크."""
+from datetime import datetime
+
+import pytest
+
+import services.stock_service as stock_service
+from routers.holidays import get_market_holidays
+from services.stock_service import get_previous_business_days
+from services.trading_calendar import TradingCalendar
+
+
+@pytest.mark.parametrize("n", [5, 20, 250])
+def test_get_previous_business_days(benchmark, n):
+    """영업일 달력이 이미 계산된 경우."""
+    end_date_str = datetime.today().strftime('%Y%m%d')
+    get_previous_business_days(n, end_date_str)
+    days = benchmark(get_previous_business_days, n, end_date_str)
+    assert len(days) == n
+
+
+@pytest.mark.parametrize("n", [5, 250])
+def test_get_previous_business_days_cold(benchmark, monkeypatch, n):
+    """프로세스 시작 직후처럼 영업일 달력을 새로 계산해야 하는 경우."""
+    end_date_str = datetime.today().strftime('%Y%m%d')
+
+    def fresh_calendar():
+        monkeypatch.setattr(stock_service, 'trading_calendar', TradingCalendar(get_market_holidays))
+
+    days = benchmark.pedantic(get_previous_business_days, args=(n, end_date_str), setup=fresh_calendar, rounds=20)
+    assert len(days) == n
@@ -0,0 +1,54 @@
+"""티커 인덱스 적재(load_ticker_map) 벤치마크."""
+import os
+
+import services.ticker_service as ticker_service
+from services.ticker_service import load_ticker_map, refresh_ticker_index
+
+
+def _reset_index(remove_file: bool):
+    ticker_service._apply(None, {})
+    ticker_service._last_refresh_attempt = float('-inf')
+    if remove_file and os.path.exists(ticker_service.TICKER_INDEX_PATH):
+        os.remove(ticker_service.TICKER_INDEX_PATH)
+
+
+def test_load_ticker_map_build(benchmark, krx):
+    """인덱스 파일이 없어 pykrx 시장별 일괄 조회로 만드는 경우."""
+    result = benchmark.pedantic(load_ticker_map, setup=lambda: _reset_index(remove_file=True), rounds=10)
+    assert len(result) == krx.size
+
+
+def test_load_ticker_map_from_file(benchmark, krx):
+    """저장된 인덱스 파일을 읽는 경우 (프로세스 재시작)."""
+    refresh_ticker_index()
+    result = benchmark.pedantic(load_ticker_map, setup=lambda: _reset_index(remove_file=False), rounds=20)
+    assert len(result) == krx.size
+
+
+def test_load_ticker_map_loaded(benchmark, krx):
+    """메모리에 적재된 인덱스를 조회하는 경우."""
+    load_ticker_map()
+    result = benchmark(load_ticker_map)
+    assert len(result) == krx.size
+
+
+def test_failed_build_is_not_retried_per_request(monkeypatch, krx):
+    """인덱스 생성이 실패하면 재시도 간격 동안은 요청마다 다시 만들지 않고, 그 사이 저장된 파일은 읽습니다."""
+    calls = []
+    get_ticker_names = ticker_service.get_ticker_names
+
+    def failing(date):
+        calls.append(date)
+        raise ConnectionError("KRX unavailable")
+
+    monkeypatch.setattr(ticker_service, 'get_ticker_names', failing)
+    assert ticker_service.get_name(krx.tickers[0]) is None
+    assert ticker_service.get_name(krx.tickers[0]) is None
+    assert len(calls) == 1
+
+    # 다른 프로세스가 저장한 (오래된) 인덱스 파일이 생기면 재시도 간격과 관계없이 바로 사용합니다.
+    monkeypatch.setattr(ticker_service, 'get_ticker_names', get_ticker_names)
+    refresh_ticker_index(krx.dates[0])
+    _reset_index(remove_file=False)
+    ticker_service._last_refresh_attempt = float('inf')
+    assert ticker_service.get_name(krx.tickers[0]) is not None
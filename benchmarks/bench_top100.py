@@ -0,0 +1,104 @@
+"""관심 종목(get_hot_stocks)과 Top 100 스냅샷 생성(_create_snapshot_data)·정리(cleanup_old_data) 벤치마크."""
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+import database
+import services.ohlcv_store as ohlcv_store
+from routers.top100 import _create_snapshot_data, cleanup_old_data, get_hot_stocks
+from services.firestore_service import TOP100_COLLECTION, hot_stocks_cache, snapshot_cache
+from services.hot_stocks_service import DEFAULT_LOOKBACK, DEFAULT_SURGE_MULTIPLE, TOP_RANK
+from services.signal_service import SIGNAL_COLLECTION, SIGNAL_SUBCOLLECTION
+from services.ticker_service import load_ticker_map
+
+
+def _hot_stocks(universe: str):
+    return asyncio.run(get_hot_stocks(DEFAULT_LOOKBACK, DEFAULT_SURGE_MULTIPLE, universe, "json"))
+
+
+def _clear_caches():
+    snapshot_cache.clear()
+    hot_stocks_cache.clear()
+
+
+def test_get_hot_stocks_top100(benchmark, top100_snapshots):
+    """Firestore Top 100 스냅샷 기준 (캐시 없이 일괄 조회부터 계산까지)."""
+    result = benchmark.pedantic(_hot_stocks, args=("top100",), setup=_clear_caches, rounds=20)
+    assert isinstance(result, (list, dict))
+
+
+def test_get_hot_stocks_top100_cached(benchmark, top100_snapshots):
+    """같은 조건의 결과가 캐시에 있는 경우."""
+    _hot_stocks("top100")
+    benchmark(_hot_stocks, "top100")
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["cold", "cached"])
+def test_get_hot_stocks_all(benchmark, local_store, cached):
+    """로컬 시세 저장소의 전 종목 기준."""
+    load_ticker_map()
+    if cached:
+        _hot_stocks("all")
+        benchmark(_hot_stocks, "all")
+    else:
+        benchmark.pedantic(_hot_stocks, args=("all",), setup=_clear_caches, rounds=10)
+
+
+def test_get_hot_stocks_all_with_closed_day(krx, monkeypatch):
+    """조회 구간에 시세가 없는 날(달력에 없는 휴장일)이 있어도 직전 실제 거래일 기준으로 계산하는지 확인합니다."""
+    from pykrx import stock
+
+    closed_date = krx.dates[-2]
+
+    def get_market_ohlcv_by_ticker(date, market="KOSPI", **kwargs):
+        df = krx.get_market_ohlcv_by_ticker(date, market)
+        return df.iloc[0:0] if date == closed_date else df
+
+    monkeypatch.setattr(stock, 'get_market_ohlcv_by_ticker', get_market_ohlcv_by_ticker)
+    load_ticker_map()
+    result = _hot_stocks("all")
+    records = result if isinstance(result, list) else []
+    reference_values = pd.concat([krx.table(krx.dates[-1], market) for market in krx.markets])['거래대금']
+    top_tickers = set(reference_values.nlargest(TOP_RANK).index)
+    # 휴장일을 직전 영업일로 쓰면 기준일 상위 종목이 모두 신규 진입으로 잡힙니다.
+    assert sum(record["티커"] in top_tickers and not record["이전영업일Top100"] for record in records) < TOP_RANK
+
+
+def test_create_snapshot_data_local(benchmark, local_store, krx, reference_date):
+    """당일 파티션이 로컬 저장소에 있는 경우."""
+    load_ticker_map()
+    result = benchmark(_create_snapshot_data, reference_date)
+    assert "오류" not in str(result)
+
+
+def test_create_snapshot_data_fetch(benchmark, krx, reference_date):
+    """당일 시세를 pykrx에서 받아 파티션으로 저장하는 경우."""
+    load_ticker_map()
+
+    def remove_partition():
+        path = ohlcv_store._partition_path(reference_date)
+        if os.path.exists(path):
+            os.remove(path)
+        ohlcv_store._read_partition_cached.cache_clear()
+
+    result = benchmark.pedantic(_create_snapshot_data, args=(reference_date,), setup=remove_partition, rounds=10)
+    assert "오류" not in str(result)
+
+
+def test_cleanup_old_data_removes_signals(top100_snapshots, krx):
+    """보관 기간이 지난 날짜의 스냅샷과 신호 요약·종목별 신호 문서가 모두 삭제되는지 확인합니다."""
+    signal_ref = database.db.collection(SIGNAL_COLLECTION)
+    for date in top100_snapshots:
+        signal_ref.document(date).set({"기준일": date})
+        for ticker in krx.tickers[:3]:
+            signal_ref.document(date).collection(SIGNAL_SUBCOLLECTION).document(ticker).set({"ticker": ticker})
+
+    result = cleanup_old_data(retention_days=5)
+    cutoff_date = result["기준일"]
+    assert result["신호삭제건수"] == 4 * sum(date < cutoff_date for date in top100_snapshots)
+
+    remaining = [doc_ref.id for doc_ref in signal_ref.list_documents()]
+    assert remaining == [date for date in top100_snapshots if date >= cutoff_date]
+    assert all(doc.id >= cutoff_date for doc in database.db.collection(TOP100_COLLECTION).stream())
@@ -0,0 +1,120 @@
+"""벤치마크 공통 설정.
+
+앱 모듈을 import하기 전에 환경 변수를 채우고 Firestore 클라이언트를 메모리 대체 구현으로 바꿉니다.
+BENCHMARK_FIRESTORE=emulator이면 FIRESTORE_EMULATOR_HOST의 에뮬레이터를 그대로 사용합니다.
+"""
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+
+_data_dir = tempfile.mkdtemp(prefix="pullback-bench-")
+os.environ.setdefault('FIRESTORE_PROJECT_ID', 'pullback-benchmark')
+# 클라이언트 생성 시 자격 증명을 찾지 않도록 에뮬레이터 주소를 지정합니다 (메모리 모드에서는 접속하지 않음).
+os.environ.setdefault('FIRESTORE_EMULATOR_HOST', 'localhost:8080')
+os.environ.setdefault('OHLCV_STORE_DIR', os.path.join(_data_dir, 'ohlcv'))
+os.environ.setdefault('INDICATOR_STATE_DIR', os.path.join(_data_dir, 'indicators'))
+os.environ.setdefault('TICKER_INDEX_PATH', os.path.join(_data_dir, 'ticker_index.json'))
+# 합성 시장은 즉시 응답하므로 KRX 호출 제한을 사실상 없앱니다.
+os.environ.setdefault('KRX_RATE_PER_SECOND', '1000000')
+os.environ.setdefault('KRX_RATE_BURST', '1000000')
+os.environ.setdefault('KRX_FETCH_WORKERS', '8')
+
+import database
+from fakes import FakeAsyncFirestore, FakeFirestore, FakeKrx
+
+USE_EMULATOR = os.getenv('BENCHMARK_FIRESTORE') == 'emulator'
+if not USE_EMULATOR:
+    database.db = FakeFirestore()
+    database.async_db = FakeAsyncFirestore(database.db)
+
+import routers.holidays as holidays_router
+import services.indicator_service as indicator_service
+import services.ohlcv_store as ohlcv_store
+import services.ticker_service as ticker_service
+from services.firestore_service import TOP100_COLLECTION, hot_stocks_cache, snapshot_cache
+from services.screener_service import indicator_table_cache
+from services.signal_service import ranking_cache, signal_cache
+from services.trading_calendar import to_yyyymmdd
+
+# 벤치마크할 종목 수 (쉼표로 구분)
+UNIVERSE_SIZES = [int(size) for size in os.getenv('BENCHMARK_UNIVERSE_SIZES', '100,1000,3000').split(',')]
+# 합성 시장의 거래일 수 (눌림목 판정의 100일 조회 구간과 관심 종목의 조회 구간을 모두 포함)
+MARKET_DAYS = 130
+
+_markets: dict[int, FakeKrx] = {}
+_store_dirs: dict[int, str] = {}
+
+
+def pytest_generate_tests(metafunc):
+    if 'universe_size' in metafunc.fixturenames:
+        metafunc.parametrize('universe_size', UNIVERSE_SIZES, ids=[f"n={size}" for size in UNIVERSE_SIZES])
+
+
+def _market_dates() -> list[str]:
+    # 마지막 거래일은 장이 마감된 직전 영업일로 두어 파티션과 지표 상태가 모두 저장되도록 합니다.
+    today = datetime.today().date()
+    return to_yyyymmdd(holidays_router.trading_calendar.previous_business_days(MARKET_DAYS, today)[::-1])
+
+
+@pytest.fixture
+def reference_date() -> str:
+    """합성 시장의 마지막 거래일 (YYYYMMDD)."""
+    return _market_dates()[-1]
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch, tmp_path):
+    """벤치마크마다 지표 상태·티커 인덱스·캐시·Firestore를 비운 상태에서 시작합니다."""
+    monkeypatch.setattr(indicator_service, 'INDICATOR_STATE_DIR', str(tmp_path / 'indicators'))
+    monkeypatch.setattr(ticker_service, 'TICKER_INDEX_PATH', str(tmp_path / 'ticker_index.json'))
+    monkeypatch.setattr(ticker_service, '_version', None)
+    monkeypatch.setattr(ticker_service, '_name_by_ticker', {})
+    monkeypatch.setattr(ticker_service, '_ticker_by_name', {})
+    monkeypatch.setattr(ticker_service, '_last_refresh_attempt', float('-inf'))
+    monkeypatch.setattr(ohlcv_store, 'OHLCV_STORE_DIR', str(tmp_path / 'ohlcv'))
+    ohlcv_store._read_partition_cached.cache_clear()
+    ohlcv_store.intraday_table_cache.clear()
+    snapshot_cache.clear()
+    hot_stocks_cache.clear()
+    signal_cache.clear()
+    ranking_cache.clear()
+    indicator_table_cache.clear()
+    if not USE_EMULATOR:
+        database.db.reset()
+    yield
+    ohlcv_store._read_partition_cached.cache_clear()
+
+
+@pytest.fixture
+def krx(universe_size, monkeypatch) -> FakeKrx:
+    """universe_size개 종목의 합성 시장을 pykrx 대신 사용합니다."""
+    market = _markets.get(universe_size)
+    if market is None:
+        market = _markets[universe_size] = FakeKrx(universe_size, _market_dates())
+    market.install(monkeypatch)
+    return market
+
+
+@pytest.fixture
+def local_store(krx, monkeypatch, tmp_path_factory) -> str:
+    """합성 시장의 전 거래일 파티션이 채워진 로컬 시세 저장소 (종목 수별로 한 번만 만듭니다)."""
+    path = _store_dirs.get(krx.size)
+    if path is None:
+        path = str(tmp_path_factory.mktemp(f"ohlcv-{krx.size}"))
+        monkeypatch.setattr(ohlcv_store, 'OHLCV_STORE_DIR', path)
+        ohlcv_store.get_market_tables(krx.dates)
+        _store_dirs[krx.size] = path
+    monkeypatch.setattr(ohlcv_store, 'OHLCV_STORE_DIR', path)
+    ohlcv_store._read_partition_cached.cache_clear()
+    return path
+
+
+@pytest.fixture
+def top100_snapshots(krx) -> list[str]:
+    """합성 시장의 전 거래일 Top 100 스냅샷을 Firestore에 저장합니다."""
+    collection_ref = database.db.collection(TOP100_COLLECTION)
+    for date in krx.dates:
+        collection_ref.document(date).set({'data': krx.top100_records(date)})
+    return krx.dates
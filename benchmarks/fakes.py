@@ -0,0 +1,221 @@
+"""벤치마크용 오프라인 대체 구현: 합성 시세를 돌려주는 pykrx 대체와 메모리 Firestore."""
+import numpy as np
+import pandas as pd
+from google.cloud.firestore_v1.field_path import FieldPath
+
+OHLCV_COLUMNS = ['시가', '고가', '저가', '종가', '거래량', '거래대금', '등락률']
+
+
+class FakeKrx:
+    """종목 수와 거래일이 고정된 결정적 합성 시장.
+
+    티커 앞 절반은 코스피, 나머지는 코스닥이며 종가는 시드가 고정된 랜덤 워크입니다.
+    install()은 pykrx.stock의 조회 함수를 이 시장의 데이터를 돌려주는 함수로 바꿉니다.
+    """
+
+    def __init__(self, size: int, dates: list[str], seed: int = 0):
+        self.size = size
+        self.dates = list(dates)
+        self.tickers = [f"{i:06d}" for i in range(size)]
+        self.markets = {
+            "KOSPI": self.tickers[:size // 2],
+            "KOSDAQ": self.tickers[size // 2:],
+        }
+        self.names = {ticker: f"종목{ticker}" for ticker in self.tickers}
+
+        rng = np.random.default_rng(seed)
+        shape = (len(self.dates), size)
+        base = rng.uniform(1_000, 100_000, size)
+        # 랜덤 워크에 주기 성분을 더해 정배열·눌림 구간이 골고루 나오도록 합니다.
+        cycle = 0.08 * np.sin(np.arange(len(self.dates))[:, None] / rng.uniform(5, 20, size) + rng.uniform(0, 6, size))
+        close = base * np.exp(np.cumsum(rng.normal(0, 0.015, shape), axis=0) + cycle)
+        self._close = np.round(close).astype(np.int64)
+        self._volume = rng.lognormal(10, 1.2, shape).astype(np.int64) + 1
+        self._row = {date: i for i, date in enumerate(self.dates)}
+        self._tables = {}
+
+    def table(self, date: str, market: str) -> pd.DataFrame:
+        """pykrx.stock.get_market_ohlcv_by_ticker와 같은 형식의 시장별 일별 시세."""
+        row = self._row.get(date)
+        if row is None:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        key = (date, market)
+        if key not in self._tables:
+            cols = [int(ticker) for ticker in self.markets[market]]
+            close = self._close[row, cols]
+            volume = self._volume[row, cols]
+            prev = self._close[row - 1, cols] if row > 0 else close
+            df = pd.DataFrame({
+                '시가': prev,
+                '고가': np.maximum(prev, close),
+                '저가': np.minimum(prev, close),
+                '종가': close,
+                '거래량': volume,
+                '거래대금': close * volume,
+                '등락률': np.round((close / prev - 1) * 100, 2),
+            }, index=pd.Index(self.markets[market], name='티커'))
+            self._tables[key] = df
+        return self._tables[key]
+
+    def get_market_ohlcv_by_ticker(self, date, market="KOSPI", **kwargs):
+        return self.table(date, market).copy()
+
+    def get_market_ohlcv(self, fromdate, todate, ticker, **kwargs):
+        col = int(ticker)
+        rows = [i for i, date in enumerate(self.dates) if fromdate <= date <= todate]
+        close = self._close[rows, col]
+        volume = self._volume[rows, col]
+        index = pd.DatetimeIndex(pd.to_datetime([self.dates[i] for i in rows], format='%Y%m%d'), name='날짜')
+        return pd.DataFrame({
+            '시가': close, '고가': close, '저가': close, '종가': close,
+            '거래량': volume, '거래대금': close * volume, '등락률': 0.0
+        }, index=index)
+
+    def get_market_ticker_name(self, ticker):
+        return self.names[ticker]
+
+    def get_market_price_change_by_ticker(self, fromdate, todate, market="KOSPI", **kwargs):
+        tickers = self.markets[market]
+        return pd.DataFrame({'종목명': [self.names[t] for t in tickers]}, index=pd.Index(tickers, name='티커'))
+
+    def install(self, monkeypatch):
+        from pykrx import stock
+        for name in ('get_market_ohlcv_by_ticker', 'get_market_ohlcv', 'get_market_ticker_name',
+                     'get_market_price_change_by_ticker'):
+            monkeypatch.setattr(stock, name, getattr(self, name))
+
+    def top100_records(self, date: str) -> list[dict]:
+        """daily_top100 스냅샷과 같은 형식(코스피 거래대금 상위 100종목)의 레코드."""
+        df = self.table(date, "KOSPI").sort_values('거래대금', ascending=False).head(100)
+        return [
+            {'종목명': self.names[ticker], '거래량': int(row['거래량']), '거래대금': int(row['거래대금'])}
+            for ticker, row in df.iterrows()
+        ]
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id: str, data: dict | None):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> dict | None:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, db: 'FakeFirestore', path: str, doc_id: str):
+        self._db = db
+        self._store = db.collections.setdefault(path, {})
+        self._path = f"{path}/{doc_id}"
+        self.id = doc_id
+
+    def collection(self, name: str) -> 'FakeCollection':
+        return self._db.collection(f"{self._path}/{name}")
+
+    def get(self) -> FakeSnapshot:
+        return FakeSnapshot(self.id, self._store.get(self.id))
+
+    def set(self, data: dict):
+        self._store[self.id] = dict(data)
+
+    def delete(self):
+        self._store.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, store: dict, filters: list):
+        self._store = store
+        self._filters = filters
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return FakeQuery(self._store, self._filters + [(field_path, op_string, value)])
+
+    def select(self, field_paths):
+        return self
+
+    def _matches(self, doc_id: str, data: dict) -> bool:
+        for field_path, op_string, value in self._filters:
+            if field_path == FieldPath.document_id():
+                actual, value = doc_id, value.id
+            else:
+                actual = data.get(field_path)
+            if op_string == '==' and not actual == value:
+                return False
+            if op_string == '<' and not (actual is not None and actual < value):
+                return False
+        return True
+
+    def stream(self):
+        for doc_id in sorted(self._store):
+            if self._matches(doc_id, self._store[doc_id]):
+                yield FakeSnapshot(doc_id, self._store[doc_id])
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db: 'FakeFirestore', path: str):
+        super().__init__(db.collections.setdefault(path, {}), [])
+        self._db = db
+        self._path = path
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self._db, self._path, doc_id)
+
+    def list_documents(self):
+        # 실제 클라이언트처럼 데이터 없이 하위 컬렉션만 있는 문서도 포함합니다.
+        prefix = f"{self._path}/"
+        doc_ids = set(self._store)
+        doc_ids.update(
+            path[len(prefix):].split('/', 1)[0]
+            for path, docs in self._db.collections.items() if path.startswith(prefix) and docs
+        )
+        return [self.document(doc_id) for doc_id in sorted(doc_ids)]
+
+
+class FakeBatch:
+    def __init__(self):
+        self._ops = []
+
+    def set(self, doc_ref: FakeDocument, data: dict):
+        self._ops.append((doc_ref.set, data))
+
+    def delete(self, doc_ref: FakeDocument):
+        self._ops.append((lambda _: doc_ref.delete(), None))
+
+    def commit(self):
+        for op, data in self._ops:
+            op(data)
+        self._ops = []
+
+
+class FakeFirestore:
+    """테스트 대상 코드가 사용하는 범위의 google.cloud.firestore.Client 대체 (메모리 저장)."""
+
+    def __init__(self):
+        # 컬렉션 경로(하위 컬렉션은 '컬렉션/문서/하위컬렉션')별 {문서 ID: 데이터}
+        self.collections: dict[str, dict] = {}
+
+    def reset(self):
+        self.collections.clear()
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch()
+
+
+class FakeAsyncFirestore:
+    """FakeFirestore와 저장소를 공유하는 google.cloud.firestore.AsyncClient 대체."""
+
+    def __init__(self, sync_db: FakeFirestore):
+        self._db = sync_db
+
+    def collection(self, name: str) -> FakeCollection:
+        return self._db.collection(name)
+
+    async def get_all(self, references):
+        for doc_ref in references:
+            yield doc_ref.get()
@@ -1,15 +1,47 @@
 import os
-from google.cloud import firestore
-
-# 환경 변수 확인
-if not os.getenv('FIRESTORE_PROJECT_ID'):
-    raise ValueError(
-        "FIRESTORE_PROJECT_ID 환경 변수가 설정되지 않았습니다.\n"
-        "프로젝트를 사용하기 전에 FIRESTORE_PROJECT_ID 환경 변수를 설정해야 합니다.\n"
-        "Windows: $env:FIRESTORE_PROJECT_ID=\"your-project-id\"\n"
-        "macOS/Linux: export FIRESTORE_PROJECT_ID=\"your-project-id\"\n"
-        "자세한 설정 방법은 README.md 파일을 참조하세요."
-    )
-
-# Firestore 클라이언트 초기화
-db = firestore.Client(project=os.getenv('FIRESTORE_PROJECT_ID'))
\ No newline at end of file
+import threading
+
+
+def _check_project_id():
+    # 환경 변수 확인
+    if not os.getenv('FIRESTORE_PROJECT_ID'):
+        raise ValueError(
+            "FIRESTORE_PROJECT_ID 환경 변수가 설정되지 않았습니다.\n"
+            "프로젝트를 사용하기 전에 FIRESTORE_PROJECT_ID 환경 변수를 설정해야 합니다.\n"
+            "Windows: $env:FIRESTORE_PROJECT_ID=\"your-project-id\"\n"
+            "macOS/Linux: export FIRESTORE_PROJECT_ID=\"your-project-id\"\n"
+            "자세한 설정 방법은 README.md 파일을 참조하세요."
+        )
+
+
+class _LazyClient:
+    """처음 사용할 때 Firestore 클라이언트를 만드는 프록시.
+
+    google.cloud.firestore는 import 비용이 커서, 모듈 import 시점이 아니라 첫 호출(또는 initialize) 시점에 불러옵니다.
+    """
+
+    def __init__(self, client_class_name: str):
+        self._client_class_name = client_class_name
+        self._client = None
+        self._lock = threading.Lock()
+
+    def initialize(self):
+        """클라이언트를 만들어 반환합니다 (이미 있으면 그대로 반환)."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    _check_project_id()
+                    from google.cloud import firestore
+                    client_class = getattr(firestore, self._client_class_name)
+                    self._client = client_class(project=os.getenv('FIRESTORE_PROJECT_ID'))
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.initialize(), name)
+
+
+# Firestore 클라이언트 (첫 사용 시 초기화)
+db = _LazyClient('Client')
+
+# 비동기 라우트용 Firestore 클라이언트 (이벤트 루프 안에서 첫 사용 시 초기화)
+async_db = _LazyClient('AsyncClient')
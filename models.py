@@ -2,4 +2,10 @@ from pydantic import BaseModel
 
 class HolidayItem(BaseModel):
     date: str # YYYY-MM-DD 형식
-    description: str
\ No newline at end of file
+    description: str
+
+class PriceTick(BaseModel):
+    ticker: str
+    price: float # 현재가
+    volume: float # 당일 누적 거래량
+    time: str | None = None # 체결 시각 (생략하면 수신 시각)
@@ -1,170 +1,251 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Query
 from datetime import datetime, timedelta
-from statistics import mean
-
-from pykrx import stock
-import pandas as pd
-import numpy as np
+from itertools import chain
 
 from database import db
-from routers.holidays import is_business_day
-
-router = APIRouter()
-
-# 종목명-티커 매핑 캐시 (초기화 시 로드)
-_ticker_map_cache = {}
-
-def load_ticker_map():
-    """코스피, 코스닥 모든 종목의 티커-종목명 매핑을 로드하여 캐시합니다."""
-    global _ticker_map_cache
-    if not _ticker_map_cache:
-        print("Loading ticker map...")
-        try:
-            all_tickers = stock.get_market_ticker_list(market="ALL")
-            temp_map = {}
-            for ticker in all_tickers:
-                try:
-                    name = stock.get_market_ticker_name(ticker)
-                    if name:
-                        temp_map[name] = ticker
-                except Exception as e:
-                    print(f"Warning: Could not get name for ticker {ticker}: {e}")
-            _ticker_map_cache = temp_map
-            print(f"Ticker map loaded with {len(_ticker_map_cache)} entries.")
-        except Exception as e:
-            print(f"Fatal Error: Failed to load ticker map: {e}")
-            _ticker_map_cache = {}
-
-from contextlib import asynccontextmanager
-
-@asynccontextmanager
-async def lifespan(app):
-    load_ticker_map()
-    yield
-
-router = APIRouter(lifespan=lifespan)
+from models import PriceTick
+from routers.holidays import trading_calendar
+from services.backtest_service import DEFAULT_HORIZONS, DEFAULT_UNIVERSE_SIZE, run_backtest
+from services.indicator_service import IndicatorState, advance_states, is_valid_ticker, load_state, save_state
+from services.intraday_service import QueuePriceFeed, intraday_monitor
+from services.ohlcv_store import is_closed_date, load_ticker_history
+from services.pullback_service import iter_scan_pullback
+from services.screener_service import MAX_SCREENER_RESULTS, SCREENER_FIELDS, screen
+from services.stock_service import get_business_days_between, get_market_ohlcv
+from services.signal_service import RANKING_SIZE, create_daily_signals, get_daily_ranking, get_daily_signal
+from services.streaming import stream_records
+from services.metrics_service import ProfiledRoute, span
+from services.ticker_service import get_name, get_ticker
+
+router = APIRouter(route_class=ProfiledRoute)
 
+@span("check_pullback")
 def check_pullback(ticker: str, date_str: str) -> dict:
     """주어진 티커와 날짜를 기준으로 눌림목 조건을 확인합니다."""
     try:
+        # 저장된 지표 상태를 기준일까지 증분 갱신할 수 있으면 전체 구간을 다시 계산하지 않습니다.
+        with span("check_pullback.advance_state"):
+            state = advance_states([ticker], date_str)[ticker]
+        if state is not None:
+            return state.evaluate(date_str)
+
         start_date = (datetime.strptime(date_str, '%Y%m%d') - timedelta(days=100)).strftime('%Y%m%d')
-        df = stock.get_market_ohlcv(fromdate=start_date, todate=date_str, ticker=ticker)
+        # 로컬 시세 저장소에 구간 전체가 있으면 재조회 없이 사용합니다.
+        with span("check_pullback.load_local"):
+            df = load_ticker_history(ticker, get_business_days_between(start_date, date_str))
+        if df is None:
+            with span("check_pullback.fetch_remote"):
+                df = get_market_ohlcv(ticker, start_date, date_str)
 
         if len(df) < 60:
             return {"is_pullback": False, "reason": "데이터 부족 (최소 60일 필요)"}
 
-        df['ma5'] = df['종가'].rolling(5).mean()
-        df['ma20'] = df['종가'].rolling(20).mean()
-        df['ma60'] = df['종가'].rolling(60).mean()
-        df['avg_vol_3'] = df['거래량'].rolling(3).mean()
-
-        latest = df.iloc[-1]
-
-        cond1_ma_aligned = bool(latest['ma5'] > latest['ma20'] > latest['ma60'])
-        ma20_slope = np.polyfit(range(3), df['ma20'].iloc[-3:], 1)[0]
-        cond1_ma20_rising = bool(ma20_slope > 0)
-
-        recent_high_found = False
-        avg_vol_rise = 0
-        high_date_index = None
-
-        high_window_df = df.iloc[-46:-1]
-        valid_highs = high_window_df[high_window_df['종가'] > high_window_df['ma20'] * 1.05]
-        if not valid_highs.empty:
-            high_date_index = valid_highs.index[-1]
-            days_since_high = (df.index[-1] - high_date_index).days
-            if days_since_high >= 3 and days_since_high <= 30:
-                recent_high_found = True
-                high_date_loc = df.index.get_loc(high_date_index)
-                if high_date_loc >= 10:
-                    avg_vol_rise = df.iloc[high_date_loc - 10:high_date_loc]['거래량'].mean()
-
-        cond3_near_ma20 = bool(pd.notna(latest['ma20']) and (latest['ma20'] * 0.98 <= latest['종가'] <= latest['ma20'] * 1.03))
-
-        cond4_volume_decreased = False
-        if recent_high_found and avg_vol_rise > 0 and pd.notna(latest['avg_vol_3']):
-            cond4_volume_decreased = latest['avg_vol_3'] < avg_vol_rise * 0.8
-
-        conditions = [bool(cond1_ma_aligned), bool(cond1_ma20_rising), bool(recent_high_found), bool(cond3_near_ma20), bool(cond4_volume_decreased)]
-        satisfied = sum(conditions)
-        score = round(satisfied / len(conditions), 2)
-
-        is_pullback = satisfied >= 4
-
-        return {
-            "is_pullback": is_pullback,
-            "score": score,
-            "details": {
-                "기준일": date_str,
-                "종가": latest['종가'],
-                "ma5": latest['ma5'],
-                "ma20": latest['ma20'],
-                "ma60": latest['ma60'],
-                "최근3일평균거래량": latest['avg_vol_3'],
-                "상승시평균거래량": avg_vol_rise,
-                "조건1_정배열": cond1_ma_aligned,
-                "조건2_ma20상승기울기": cond1_ma20_rising,
-                "조건3_최근상승이력(고점기준)": recent_high_found,
-                "조건4_ma20근접": cond3_near_ma20,
-                "조건5_거래량감소": cond4_volume_decreased,
-                "조건_만족도": f"{satisfied}/5"
-            }
-        }
+        # 다음 호출부터 증분 갱신할 수 있도록 지표 상태를 저장합니다 (더 최근 상태가 있으면 유지).
+        state = IndicatorState.from_history(ticker, df)
+        saved_state = load_state(ticker)
+        if saved_state is None or saved_state.last_date <= date_str:
+            save_state(state)
+        return state.evaluate(date_str)
 
     except Exception as e:
         return {"is_pullback": False, "reason": f"오류 발생: {e}"}
 
+def _find_reference_date() -> str:
+    """오늘 또는 가장 최근 영업일을 YYYYMMDD 문자열로 반환합니다."""
+    # 기준일 찾기 (오늘 또는 가장 최근 영업일, 최대 5일 전까지)
+    today = datetime.today().date()
+    reference_date = trading_calendar.nearest_business_day(today)
+    if (today - reference_date).days > 5:
+        raise HTTPException(status_code=404, detail="최근 5일 내 영업일을 찾을 수 없습니다.")
+
+    return reference_date.strftime('%Y%m%d')
+
+@router.get("/pullback/scan")
+def scan_pullback_market(date: str | None = None, tickers: list[str] | None = Query(None), only_pullback: bool = False,
+                         format: str = Query("json", pattern="^(json|ndjson|sse)$")):
+    """코스피·코스닥 전 종목(또는 지정 종목)의 눌림목 상태를 한 번에 판정합니다.
+
+    format=ndjson 또는 sse이면 점수순 정렬 없이 종목별 결과를 계산되는 대로 스트리밍하고 마지막에 요약을 보냅니다.
+    """
+    reference_date_str = date or _find_reference_date()
+
+    try:
+        results = iter_scan_pullback(reference_date_str, tickers)
+        first_result = next(results, None)
+    except Exception as e:
+        print(f"Error scanning pullback for {reference_date_str}: {e}")
+        raise HTTPException(status_code=500, detail=f"눌림목 스캔 중 오류 발생: {e}")
+
+    if first_result is None:
+        raise HTTPException(status_code=404, detail=f"{reference_date_str} 기준 시세 데이터가 없습니다.")
+
+    counts = {"종목수": 0, "눌림목종목수": 0}
+
+    def iter_results():
+        for result in chain([first_result], results):
+            if only_pullback and not result["is_pullback"]:
+                continue
+            result["stock_name"] = get_name(result["ticker"])
+            counts["종목수"] += 1
+            counts["눌림목종목수"] += result["is_pullback"]
+            yield result
+
+    if format != "json":
+        return stream_records(iter_results(), lambda: {"기준일": reference_date_str, **counts}, format)
+
+    try:
+        results = sorted(iter_results(), key=lambda r: r.get("score", 0), reverse=True)
+    except Exception as e:
+        print(f"Error scanning pullback for {reference_date_str}: {e}")
+        raise HTTPException(status_code=500, detail=f"눌림목 스캔 중 오류 발생: {e}")
+
+    return {
+        "기준일": reference_date_str,
+        **counts,
+        "results": results
+    }
+
+@router.get("/screener")
+def run_screener(q: str, date: str | None = None, sort: str = "-score",
+                 limit: int = Query(100, ge=1, le=MAX_SCREENER_RESULTS)):
+    """조건식(q)을 만족하는 종목을 기준일 전 종목의 지표 테이블에서 찾아 정렬 기준(sort) 순으로 반환합니다.
+
+    예: q=ma5>ma20>ma60 AND close within 2% of ma20 AND value_rank<=200, sort=-score (앞의 '-'는 내림차순)
+    """
+    reference_date_str = date or _find_reference_date()
+    try:
+        result = screen(reference_date_str, q, sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error running screener for {reference_date_str} ({q}): {e}")
+        raise HTTPException(status_code=500, detail=f"스크리너 실행 중 오류 발생: {e}")
+
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"{reference_date_str} 기준 시세 데이터가 없습니다.")
+    for item in result["results"]:
+        item["stock_name"] = get_name(item["ticker"])
+    return {"query": q, **result}
+
+@router.get("/screener/fields")
+def get_screener_fields():
+    """조건식과 정렬 기준에 쓸 수 있는 필드 목록을 조회합니다."""
+    return SCREENER_FIELDS
+
+@router.get("/pullback/backtest")
+def backtest_pullback(start: str, end: str, tickers: list[str] | None = Query(None),
+                      universe_size: int = DEFAULT_UNIVERSE_SIZE, horizons: list[int] = Query(list(DEFAULT_HORIZONS)),
+                      include_signals: bool = False):
+    """기간 내 모든 영업일의 눌림목 신호 적중률과 N일 후 수익률을 집계합니다."""
+    try:
+        return run_backtest(start, end, tickers, universe_size, tuple(horizons), include_signals)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error running backtest for {start}~{end}: {e}")
+        raise HTTPException(status_code=500, detail=f"백테스트 중 오류 발생: {e}")
+
+@router.post("/pullback/watchlist")
+def check_pullback_watchlist(tickers: list[str] = Body(...), date: str | None = None):
+    """관심 종목 목록의 눌림목 상태를 저장된 지표 상태의 증분 갱신으로 판정합니다."""
+    invalid = [ticker for ticker in tickers if not is_valid_ticker(ticker)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"올바르지 않은 종목 코드입니다: {', '.join(map(str, invalid))}")
+
+    reference_date_str = date or _find_reference_date()
+    states = advance_states(tickers, reference_date_str)
+
+    results = []
+    for ticker in tickers:
+        state = states[ticker]
+        # 저장된 상태가 없거나 증분 갱신이 불가능한 종목만 전체 구간을 계산합니다.
+        result = state.evaluate(reference_date_str) if state is not None else check_pullback(ticker, reference_date_str)
+        result["ticker"] = ticker
+        result["stock_name"] = get_name(ticker)
+        results.append(result)
+    return {"기준일": reference_date_str, "results": results}
+
+@router.post("/pullback/intraday/watch")
+def watch_intraday(tickers: list[str] = Body(...)):
+    """종목들을 장중 감시 대상에 추가합니다. 이후 체결 시세마다 당일 봉만 갱신해 눌림목 상태를 다시 판정합니다."""
+    try:
+        return intraday_monitor.watch(tickers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error preparing intraday watch for {tickers}: {e}")
+        raise HTTPException(status_code=500, detail=f"장중 감시 준비 중 오류 발생: {e}")
+
+@router.delete("/pullback/intraday/watch")
+def unwatch_intraday(tickers: list[str] = Body(...)):
+    """종목들을 장중 감시 대상에서 뺍니다."""
+    return {"감시종목수": intraday_monitor.unwatch(tickers)}
+
+@router.get("/pullback/intraday/status")
+def get_intraday_status(tickers: list[str] | None = Query(None)):
+    """감시 종목(또는 지정 종목)의 가장 최근 장중 눌림목 판정 결과를 반환합니다."""
+    status = intraday_monitor.status(tickers)
+    for result in status["results"]:
+        result["stock_name"] = get_name(result["ticker"])
+    return status
+
+@router.post("/pullback/intraday/ticks")
+def push_intraday_ticks(ticks: list[PriceTick] = Body(...)):
+    """체결 시세를 장중 감시의 시세 입력 큐에 넣습니다 (INTRADAY_FEED=queue일 때만 사용할 수 있습니다)."""
+    if not isinstance(intraday_monitor.feed, QueuePriceFeed):
+        raise HTTPException(status_code=400, detail="시세 입력이 큐(INTRADAY_FEED=queue)로 설정되어 있지 않습니다.")
+    for tick in ticks:
+        intraday_monitor.feed.push(tick.ticker, tick.price, tick.volume, tick.time)
+    return {"접수건수": len(ticks)}
+
+@router.post("/pullback/signals/{date}")
+def create_pullback_signals(date: str):
+    """장 마감일의 전 종목 눌림목 신호를 계산해 저장합니다 (스냅샷 생성 시 자동으로 실행됩니다)."""
+    try:
+        return create_daily_signals(date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error creating daily pullback signals for {date}: {e}")
+        raise HTTPException(status_code=500, detail=f"눌림목 신호 계산 중 오류 발생: {e}")
+
+@router.get("/pullback/top/{date}")
+def get_top_pullbacks(date: str, limit: int = Query(20, ge=1, le=RANKING_SIZE), only_pullback: bool = False):
+    """미리 계산된 날짜별 눌림목 신호에서 점수가 높은 종목을 점수순으로 조회합니다."""
+    summary = get_daily_ranking(date)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"{date}의 눌림목 신호가 없습니다. 먼저 스냅샷(또는 신호)을 생성해주세요.")
+
+    ranking = summary["ranking"]
+    if only_pullback:
+        ranking = [entry for entry in ranking if entry["is_pullback"]]
+    return {
+        "기준일": date,
+        "종목수": summary["종목수"],
+        "눌림목종목수": summary["눌림목종목수"],
+        "results": ranking[:limit]
+    }
+
 @router.get("/pullback/by-name/{stock_name}")
 def get_pullback_status_by_name(stock_name: str):
     """주어진 종목명에 대해 오늘 또는 가장 최근 영업일 기준으로 눌림목 상태를 확인합니다."""
     
-    # 종목명으로 티커 찾기
-    ticker = _ticker_map_cache.get(stock_name)
+    # 종목명으로 티커 찾기 (티커 인덱스는 하루 한 번 백그라운드에서 갱신됩니다)
+    ticker = get_ticker(stock_name)
     if not ticker:
-        # 캐시에 없으면 실시간으로 다시 시도 (캐시 로드 실패 대비)
-        # 또는 캐시 로드 실패 시 에러 반환하도록 수정 가능
-        print(f"Warning: Ticker for '{stock_name}' not found in cache. Attempting real-time lookup.")
-        try:
-            tickers = stock.get_market_ticker_list(market="ALL")
-            found = False
-            for t in tickers:
-                try:
-                    if stock.get_market_ticker_name(t) == stock_name:
-                        ticker = t
-                        found = True
-                        # 찾았으면 캐시 업데이트 (선택적)
-                        _ticker_map_cache[stock_name] = ticker 
-                        print(f"Found ticker {ticker} for '{stock_name}' and updated cache.")
-                        break
-                except Exception:
-                    continue # 이름 조회 실패 시 다음 티커로
-            if not found:
-                 raise HTTPException(status_code=404, detail=f"종목명 '{stock_name}'에 해당하는 티커를 찾을 수 없습니다.")
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=f"티커 조회 중 오류 발생: {e}")
+        raise HTTPException(status_code=404, detail=f"종목명 '{stock_name}'에 해당하는 티커를 찾을 수 없습니다.")
 
     # --- 이하 로직은 기존 get_pullback_status와 유사 ---
-    today = datetime.today().date()
-    reference_date = None
-
-    # 기준일 찾기 (오늘 또는 가장 최근 영업일)
-    if is_business_day(today):
-        reference_date = today
-    else:
-        # 최대 5일 전까지 거슬러 올라가며 영업일 찾기
-        for i in range(1, 6):
-            check_date = today - timedelta(days=i)
-            if is_business_day(check_date):
-                reference_date = check_date
-                break
-    
-    if not reference_date:
-        raise HTTPException(status_code=404, detail="최근 5일 내 영업일을 찾을 수 없습니다.")
-
-    reference_date_str = reference_date.strftime('%Y%m%d')
+    reference_date_str = _find_reference_date()
     
-    # check_pullback 함수 호출 (찾은 티커 사용)
-    result = check_pullback(ticker, reference_date_str)
+    # 장 마감일은 스냅샷 시점에 미리 계산해 둔 신호를, 장중에는 감시 중인 종목의 체결 시세 기준 판정을 읽고,
+    # 없으면 check_pullback으로 계산합니다.
+    if is_closed_date(reference_date_str):
+        result = get_daily_signal(reference_date_str, ticker)
+    else:
+        result = intraday_monitor.get(ticker)
+    if result is None:
+        result = check_pullback(ticker, reference_date_str)
     
     if "reason" in result and "오류 발생" in result["reason"]:
          raise HTTPException(status_code=500, detail=result["reason"])
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from services.metrics_service import ProfiledRoute
+from services.warmup_service import get_readiness
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/health", tags=["health"])
+def health_check():
+    """앱 준비 상태를 조회합니다. 백그라운드 준비 단계(Firestore, 사용자 지정 공휴일, 영업일 달력, 티커 인덱스, pykrx)를 모두 한 번씩 시도하면 200을 반환합니다.
+
+    실패한 단계는 백그라운드에서 계속 다시 시도하며, 그동안 응답의 degraded가 true입니다.
+    """
+    readiness = get_readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
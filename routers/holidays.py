@@ -1,60 +1,107 @@
 from fastapi import APIRouter, HTTPException, Body
 from datetime import datetime, date as DateObject
-import holidays
 import os
+import threading
 
 from models import HolidayItem # models.py에서 HolidayItem 임포트
 from database import db # database.py에서 db 임포트
+from services.metrics_service import ProfiledRoute
+from services.trading_calendar import TradingCalendar
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 # 공휴일 캐시 (연도별로 관리)
 _kr_holidays_cache = {}
-_custom_holidays_cache = {} # 사용자 지정 공휴일 캐시 추가
+# 사용자 지정 공휴일 캐시 (연도별). 처음 사용할 때 컬렉션 전체를 한 번에 읽고, 이후에는 스냅샷 리스너로 갱신합니다.
+_custom_holidays_cache = {}
+_custom_holidays_loaded = False
+_custom_holidays_lock = threading.Lock()
+_holiday_watch = None
+
+def _group_by_year(docs) -> dict[int, set[DateObject]]:
+    """custom_holidays 문서들을 연도별 날짜 집합으로 묶습니다."""
+    holidays_by_year = {}
+    for doc in docs:
+        holiday_date_str = (doc.to_dict() or {}).get('date')
+        if not holiday_date_str:
+            continue
+        try:
+            holiday_date = datetime.strptime(holiday_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            print(f"Warning: Invalid date format '{holiday_date_str}' in custom_holidays collection.")
+            continue
+        holidays_by_year.setdefault(holiday_date.year, set()).add(holiday_date)
+    return holidays_by_year
+
+def _apply_custom_holidays(holidays_by_year: dict[int, set[DateObject]], rebuild_calendar: bool = True) -> list[int]:
+    """연도별 사용자 지정 공휴일을 캐시에 반영하고, 달라진 연도의 영업일 달력만 다시 계산합니다."""
+    global _custom_holidays_loaded
+    with _custom_holidays_lock:
+        changed_years = sorted(
+            year for year in set(_custom_holidays_cache) | set(holidays_by_year)
+            if _custom_holidays_cache.get(year, set()) != holidays_by_year.get(year, set())
+        )
+        for year in changed_years:
+            _custom_holidays_cache[year] = holidays_by_year.get(year, set())
+        _custom_holidays_loaded = True
+    if rebuild_calendar:
+        for year in changed_years:
+            trading_calendar.invalidate_year(year)
+    return changed_years
+
+def load_custom_holidays(rebuild_calendar: bool = True) -> int:
+    """사용자 지정 공휴일 컬렉션 전체(모든 연도)를 한 번의 조회로 읽어 캐시에 반영하고, 읽은 공휴일 수를 반환합니다."""
+    holidays_by_year = _group_by_year(db.collection('custom_holidays').stream())
+    _apply_custom_holidays(holidays_by_year, rebuild_calendar)
+    count = sum(len(dates) for dates in holidays_by_year.values())
+    print(f"Loaded {count} custom holidays for {len(holidays_by_year)} years from Firestore.")
+    return count
+
+def _on_custom_holidays_snapshot(docs, changes, read_time):
+    # 다른 프로세스(워커)에서 등록한 공휴일도 이 콜백으로 반영됩니다.
+    changed_years = _apply_custom_holidays(_group_by_year(docs))
+    if changed_years:
+        print(f"Custom holidays updated from Firestore for years {changed_years}.")
+
+def start_holiday_listener():
+    """사용자 지정 공휴일 컬렉션의 스냅샷 리스너를 시작합니다 (이미 실행 중이면 무시)."""
+    global _holiday_watch
+    if _holiday_watch is None:
+        _holiday_watch = db.collection('custom_holidays').on_snapshot(_on_custom_holidays_snapshot)
+
+def stop_holiday_listener():
+    """스냅샷 리스너를 종료합니다."""
+    global _holiday_watch
+    if _holiday_watch is not None:
+        _holiday_watch.unsubscribe()
+        _holiday_watch = None
 
 def get_custom_holidays(year: int) -> set[DateObject]:
-    """지정된 연도의 사용자 지정 공휴일 정보를 Firestore에서 가져오거나 캐시에서 로드합니다."""
-    if year not in _custom_holidays_cache:
-        custom_holidays_set = set()
+    """지정된 연도의 사용자 지정 공휴일을 캐시에서 반환합니다. 아직 읽지 않았으면 모든 연도를 한 번에 읽습니다."""
+    if not _custom_holidays_loaded:
+        # 영업일 달력은 연도를 계산하는 중(잠금 안)에 이 함수를 부르며, 첫 조회 전에는 계산된 연도가 없으므로
+        # 달력을 다시 계산하지 않습니다.
         try:
-            collection_ref = db.collection('custom_holidays')
-            query = collection_ref.where('year', '==', year)
-            docs = query.stream()
-            for doc in docs:
-                holiday_data = doc.to_dict()
-                holiday_date_str = holiday_data.get('date')
-                if holiday_date_str:
-                    try:
-                        custom_holidays_set.add(datetime.strptime(holiday_date_str, '%Y-%m-%d').date())
-                    except ValueError:
-                        print(f"Warning: Invalid date format '{holiday_date_str}' in custom_holidays collection for year {year}.")
-            _custom_holidays_cache[year] = custom_holidays_set
-            print(f"Loaded {len(custom_holidays_set)} custom holidays for {year} from Firestore.")
+            load_custom_holidays(rebuild_calendar=False)
         except Exception as e:
-            print(f"Error fetching custom holidays for {year} from Firestore: {e}")
-            _custom_holidays_cache[year] = set()
-    return _custom_holidays_cache[year]
+            print(f"Error fetching custom holidays from Firestore: {e}")
+            # 요청마다 다시 조회하지 않도록 빈 상태로 표시합니다 (준비 단계가 리스너를 붙이고 성공할 때까지 다시 읽어 채웁니다).
+            _apply_custom_holidays({}, rebuild_calendar=False)
+    return _custom_holidays_cache.get(year, set())
 
-def get_kr_holidays(year: int) -> holidays.HolidayBase:
+def get_kr_holidays(year: int) -> 'holidays.HolidayBase':
     """지정된 연도의 한국 공휴일 정보를 캐시에서 가져오거나 로드합니다."""
     if year not in _kr_holidays_cache:
+        import holidays
         _kr_holidays_cache[year] = holidays.KR(years=year)
     return _kr_holidays_cache[year]
 
-def is_business_day(target_date: DateObject) -> bool:
-    """주어진 날짜가 영업일인지 (주말, 표준 공휴일, 사용자 지정 공휴일 제외) 확인합니다."""
-    if target_date.weekday() >= 5: # 주말 체크
-        return False
-    
-    kr_holidays = get_kr_holidays(target_date.year)
-    if target_date in kr_holidays:
-        return False
-        
-    custom_holidays = get_custom_holidays(target_date.year)
-    if target_date in custom_holidays:
-        return False
-        
-    return True
+def get_market_holidays(year: int) -> set[DateObject]:
+    """지정된 연도의 휴장일(표준 공휴일 + 사용자 지정 공휴일)을 반환합니다."""
+    return set(get_kr_holidays(year)) | get_custom_holidays(year)
+
+# 영업일 달력 (사용자 지정 공휴일이 등록되면 해당 연도만 다시 계산)
+trading_calendar = TradingCalendar(get_market_holidays)
 
 @router.post("/holidays", tags=["holidays"])
 def add_custom_holiday(holiday: HolidayItem = Body(...)):
@@ -72,9 +119,13 @@ def add_custom_holiday(holiday: HolidayItem = Body(...)):
         doc_ref = db.collection('custom_holidays').document(holiday.date)
         doc_ref.set(holiday_data)
 
-        if year in _custom_holidays_cache:
-            del _custom_holidays_cache[year]
-            print(f"Custom holiday cache for year {year} invalidated.")
+        # 이 프로세스의 캐시는 바로 갱신하고, 다른 프로세스(워커)는 스냅샷 리스너로 반영합니다.
+        with _custom_holidays_lock:
+            added = _custom_holidays_loaded and holiday_date not in _custom_holidays_cache.get(year, set())
+            if added:
+                _custom_holidays_cache[year] = _custom_holidays_cache.get(year, set()) | {holiday_date}
+        if added:
+            trading_calendar.invalidate_year(year)
 
         return {"message": f"사용자 지정 공휴일 '{holiday.description}' ({holiday.date}) 등록 완료"}
 
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from services.fetch_scheduler import krx_scheduler
+from services.firestore_service import get_cache_stats
+from services.metrics_service import ProfiledRoute, get_profile, list_profiles, render_metrics
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["metrics"])
+def get_metrics():
+    """요청·단계별 지연 시간 히스토그램, 캐시 적중률, 외부 호출 수를 Prometheus 텍스트 형식으로 내보냅니다."""
+    return PlainTextResponse(
+        render_metrics(get_cache_stats(), krx_scheduler.stats()),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@router.get("/metrics/profiles", tags=["metrics"])
+def get_profiles():
+    """최근 요청 프로파일(X-Profile 헤더 또는 profile=1로 요청한 것) 목록을 조회합니다."""
+    return list_profiles()
+
+@router.get("/metrics/profiles/{profile_id}", tags=["metrics"])
+def get_profile_detail(profile_id: int, format: str = "json"):
+    """요청 프로파일의 스택별 샘플 수를 조회합니다. format=collapsed이면 flamegraph 입력 형식으로 반환합니다."""
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"프로파일 {profile_id}을(를) 찾을 수 없습니다.")
+    if format == "collapsed":
+        return PlainTextResponse('\n'.join(f"{stack} {count}" for stack, count in profile["stacks"].items()) + '\n')
+    return profile
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime, timedelta
+
+from services.fetch_scheduler import krx_scheduler
+from services.metrics_service import ProfiledRoute
+from services.ohlcv_store import list_partitions, sync_partitions
+from services.stock_service import get_business_days_between
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/ohlcv/status", tags=["ohlcv"])
+def get_ohlcv_store_status():
+    """로컬 시세 저장소에 보관 중인 파티션 현황을 조회합니다."""
+    partitions = list_partitions()
+    return {
+        "파티션수": len(partitions),
+        "시작일": partitions[0] if partitions else None,
+        "최종일": partitions[-1] if partitions else None
+    }
+
+@router.post("/ohlcv/sync", tags=["ohlcv"])
+def sync_ohlcv_store(days: int = 100):
+    """최근 days일(달력 기준) 중 로컬 시세 저장소에 없는 영업일 파티션을 채웁니다."""
+    try:
+        today = datetime.today()
+        start_date = (today - timedelta(days=days)).strftime('%Y%m%d')
+        dates = get_business_days_between(start_date, today.strftime('%Y%m%d'))
+        added = sync_partitions(dates)
+        return {"message": f"시세 파티션 {len(added)}개 추가 완료", "추가된날짜": added}
+    except Exception as e:
+        print(f"Error syncing OHLCV store: {e}")
+        raise HTTPException(status_code=500, detail=f"시세 저장소 동기화 중 오류 발생: {e}")
+
+@router.get("/fetch/stats", tags=["ohlcv"])
+def get_fetch_stats():
+    """pykrx 호출 스케줄러의 호출 수, 지연 시간, 재시도 및 병합 통계를 조회합니다."""
+    return krx_scheduler.stats()
@@ -1,45 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
-from statistics import mean
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime
 
-from pykrx import stock
 import pandas as pd
 import numpy as np
 
 from database import db
-from routers.holidays import is_business_day
-from services.firestore_service import get_firestore_data
+from routers.holidays import trading_calendar
+from services.cache_service import MISSING
+from services.firestore_service import (
+    delete_snapshots, get_cache_stats, get_firestore_data_async, get_firestore_data_many, hot_stocks_cache,
+    hot_stocks_ttl, invalidate_snapshot, list_snapshot_ids_before
+)
+from services.hot_stocks_service import (
+    DEFAULT_LOOKBACK, DEFAULT_SURGE_MULTIPLE, TOP_RANK, compute_hot_stocks, market_matrices, snapshot_matrices, to_records
+)
+from services.metrics_service import ProfiledRoute, span
+from services.ohlcv_store import get_market_table, get_market_tables, is_closed_date
+from services.signal_service import create_daily_signals, delete_signals, list_signal_dates_before
+from services.snapshot_service import build_top100_records, get_backfill_status, run_backfill
+from services.ticker_service import get_name
+from services.trading_calendar import to_yyyymmdd
 from services.stock_service import get_previous_business_days
+from services.streaming import stream_records
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.get("/top100/{date}")
-def get_top100(date: str):
+async def get_top100(date: str):
     """지정된 날짜의 Top 100 데이터를 Firestore에서 조회합니다."""
-    doc_ref = db.collection('daily_top100').document(date)
-    doc = doc_ref.get()
-    if doc.exists: 
-        return doc.to_dict().get('data', [])
+    data = await get_firestore_data_async(date)
+    if data is not None:
+        return data
     else:
         return {"message": "해당 날짜의 데이터가 없습니다."}, 404
 
+@span("snapshot.create")
 def _create_snapshot_data(date: str):
     """지정된 날짜의 Top 100 데이터를 생성하여 Firestore에 저장하는 내부 로직"""
     try:
-        df = stock.get_market_ohlcv_by_ticker(date)
-        top = (
-            df.sort_values(by='거래대금', ascending=False)
-            .head(100)
-            .reset_index()[['티커', '거래량', '거래대금']]
-        )
-        top['종목명'] = top['티커'].map(lambda t: stock.get_market_ticker_name(t))
-        top = top[['종목명', '거래량', '거래대금']]
-        records = top.to_dict('records')
+        # 전 종목 시세는 로컬 저장소에 하루치 파티션으로 추가되고, Top 100은 기존과 같이 코스피 기준으로 선정합니다.
+        with span("snapshot.market_table"):
+            market_table = get_market_table(date)
+        with span("snapshot.build_records"):
+            records = build_top100_records(market_table)
 
         doc_ref = db.collection('daily_top100').document(date)
-        doc_ref.set({'data': records})
-
-        return {"message": f"{date}의 Top 100 데이터 스냅샷 생성 및 저장 완료"}
+        with span("snapshot.firestore_write"):
+            doc_ref.set({'data': records})
+        invalidate_snapshot(date)
+
+        response = {"message": f"{date}의 Top 100 데이터 스냅샷 생성 및 저장 완료"}
+        # 장 마감 후 스냅샷이면 같은 시세로 전 종목 눌림목 신호도 미리 계산해 둡니다.
+        if is_closed_date(date):
+            try:
+                response["눌림목신호"] = create_daily_signals(date)
+            except Exception as e:
+                print(f"Error creating daily pullback signals for {date}: {e}")
+                response["눌림목신호"] = {"message": f"눌림목 신호 계산 중 오류 발생: {e}"}
+        return response
     except Exception as e:
         print(f"Error creating snapshot for {date}: {e}")
         return {"message": f"{date} 데이터 처리 중 오류 발생: {e}"}, 500
@@ -50,125 +69,159 @@ def create_snapshot_today():
     today_date = datetime.today().strftime('%Y%m%d')
     return _create_snapshot_data(today_date)
 
+@router.post("/snapshot/backfill")
+def backfill_snapshots(start: str, end: str, background_tasks: BackgroundTasks, resume: bool = True):
+    """기간 내 모든 영업일의 Top 100 스냅샷을 백그라운드에서 일괄 생성합니다."""
+    if get_backfill_status().get("running"):
+        raise HTTPException(status_code=409, detail="이미 진행 중인 백필 작업이 있습니다.")
+
+    def run():
+        try:
+            run_backfill(start, end, resume=resume)
+        except Exception as e:
+            print(f"Error during snapshot backfill {start}~{end}: {e}")
+
+    background_tasks.add_task(run)
+    return {"message": f"{start}~{end} 스냅샷 백필 시작. 진행 상황은 /snapshot/backfill/status에서 확인하세요."}
+
+@router.get("/snapshot/backfill/status")
+def get_snapshot_backfill_status():
+    """스냅샷 백필 작업의 진행률과 처리 속도를 조회합니다."""
+    return get_backfill_status()
+
 @router.post("/snapshot/{date}")
 def create_snapshot_with_date(date: str):
     """지정된 날짜의 Top 100 데이터를 생성하여 Firestore에 저장합니다."""
     return _create_snapshot_data(date)
 
 @router.post("/cleanup")
-def cleanup_old_data():
-    """Firestore에서 최근 5영업일 이전의 오래된 Top 100 데이터를 삭제합니다."""
+def cleanup_old_data(retention_days: int = Query(5, ge=1), dry_run: bool = False):
+    """Firestore에서 최근 retention_days영업일(기본 5) 이전의 오래된 Top 100 데이터와 일별 눌림목 신호를 삭제합니다.
+
+    dry_run=true이면 삭제하지 않고 삭제 대상만 반환합니다.
+    """
     try:
         today = datetime.today().date()
-        business_days_to_keep = []
-        current_date = today
-
-        if is_business_day(today):
-             business_days_to_keep.append(today.strftime('%Y%m%d'))
-
-        while len(business_days_to_keep) < 5:
-            current_date -= timedelta(days=1)
-            if is_business_day(current_date):
-                business_days_to_keep.append(current_date.strftime('%Y%m%d'))
-        
-        keep_dates_set = set(business_days_to_keep)
-        print(f"Keeping data for dates: {sorted(list(keep_dates_set), reverse=True)}")
-
-        collection_ref = db.collection('daily_top100')
-        docs = collection_ref.stream()
-        
-        docs_to_delete = []
-        for doc in docs:
-            if doc.id not in keep_dates_set:
-                docs_to_delete.append(doc.id)
-        
-        deleted_count = 0
-        if not docs_to_delete:
-            return {"message": "삭제할 오래된 데이터가 없습니다. (최근 5영업일 데이터만 보관 중)"}
-
-        for doc_id in docs_to_delete:
-            collection_ref.document(doc_id).delete()
-            deleted_count += 1
-            print(f"Deleted document: {doc_id}")
-
-        return {"message": f"오래된 데이터 {deleted_count}개 삭제 완료. 최근 5영업일 데이터만 보관됩니다."}
+        business_days_to_keep = to_yyyymmdd(trading_calendar.previous_business_days(retention_days, today, inclusive=True))
+        cutoff_date = business_days_to_keep[-1]
+        print(f"Keeping data for dates: {business_days_to_keep}")
+
+        docs_to_delete = list_snapshot_ids_before(cutoff_date)
+        signal_dates_to_delete = list_signal_dates_before(cutoff_date)
+
+        if dry_run:
+            return {
+                "message": f"삭제 예정 데이터 {len(docs_to_delete)}개, 신호 {len(signal_dates_to_delete)}일 (dry run, 실제 삭제하지 않음)",
+                "기준일": cutoff_date,
+                "삭제건수": 0,
+                "삭제대상": docs_to_delete,
+                "신호삭제대상": signal_dates_to_delete
+            }
+
+        if not docs_to_delete and not signal_dates_to_delete:
+            return {"message": f"삭제할 오래된 데이터가 없습니다. (최근 {retention_days}영업일 데이터만 보관 중)", "기준일": cutoff_date, "삭제건수": 0}
+
+        deleted_count = delete_snapshots(docs_to_delete)
+        signal_deleted_count = delete_signals(signal_dates_to_delete)
+        print(f"Deleted {deleted_count} snapshot documents and {signal_deleted_count} signal documents older than {cutoff_date}.")
+
+        return {
+            "message": f"오래된 데이터 {deleted_count}개, 신호 {len(signal_dates_to_delete)}일 삭제 완료. 최근 {retention_days}영업일 데이터만 보관됩니다.",
+            "기준일": cutoff_date,
+            "삭제건수": deleted_count,
+            "신호삭제건수": signal_deleted_count
+        }
     except Exception as e:
         print(f"Error during cleanup: {e}")
         return {"message": f"데이터 정리 중 오류 발생: {e}"}, 500
 
+async def _hot_stocks_from_snapshots(today_str: str, lookback: int, surge_multiple: float) -> tuple[str, list[dict]]:
+    """Firestore의 Top 100 스냅샷을 기준으로 관심 종목을 계산합니다."""
+    # 기준일 후보(오늘 + 이전 10영업일)와 그 이전 lookback영업일까지 한 번에 조회합니다.
+    # 영업일 달력은 캐시되지 않은 연도의 휴장일을 Firestore에서 동기로 읽으므로 이벤트 루프 밖에서 계산합니다.
+    dates = [today_str] + await run_in_threadpool(get_previous_business_days, 10 + lookback, today_str)
+    candidate_dates = dates[:11]
+    fetched = await get_firestore_data_many(dates)
+
+    reference_date_str = next((date for date in candidate_dates if fetched.get(date)), None)
+    if not reference_date_str:
+        raise HTTPException(status_code=404, detail="최근 영업일의 Top 100 데이터가 없습니다. 먼저 스냅샷을 생성해주세요.")
+    if reference_date_str != today_str:
+        print(f"Warning: Data for today ({today_str}) not found. Using data from the most recent business day: {reference_date_str}")
+
+    cache_key = ('top100', reference_date_str, lookback, surge_multiple)
+    cached_result = hot_stocks_cache.get(cache_key)
+    if cached_result is not MISSING:
+        return reference_date_str, cached_result
+
+    # 기준일 이전 lookback영업일은 이미 조회한 날짜 목록에서 바로 이어지는 구간입니다.
+    start = dates.index(reference_date_str)
+    all_relevant_dates = dates[start:start + lookback + 1]
+
+    value, volume = snapshot_matrices(fetched, all_relevant_dates)
+    records = to_records(compute_hot_stocks(value, volume, lookback, surge_multiple), lookback)
+    hot_stocks_cache.set(cache_key, records, ttl=hot_stocks_ttl(reference_date_str))
+    return reference_date_str, records
+
+def _hot_stocks_from_market(today_str: str, lookback: int, surge_multiple: float) -> tuple[str, list[dict]]:
+    """로컬 시세 저장소의 전 종목 시세를 기준으로 관심 종목을 계산합니다 (Top100 진입은 거래대금 순위 기준)."""
+    # 장 시작 전에는 당일 시세가 비어 있으므로 직전 영업일을 기준일로 사용합니다.
+    candidate_dates = to_yyyymmdd(trading_calendar.previous_business_days(2, datetime.strptime(today_str, '%Y%m%d').date(), inclusive=True))
+    reference_date_str = next((date for date in candidate_dates if not get_market_table(date).empty), None)
+    if not reference_date_str:
+        raise HTTPException(status_code=404, detail="최근 영업일의 시세 데이터가 없습니다.")
+
+    cache_key = ('all', reference_date_str, lookback, surge_multiple)
+    cached_result = hot_stocks_cache.get(cache_key)
+    if cached_result is not MISSING:
+        return reference_date_str, cached_result
+
+    all_relevant_dates = [reference_date_str] + get_previous_business_days(lookback, reference_date_str)
+    tables = get_market_tables(all_relevant_dates)
+
+    value, volume = market_matrices(tables, all_relevant_dates)
+    hot = compute_hot_stocks(value, volume, lookback, surge_multiple, top_rank=TOP_RANK)
+    records = to_records(hot, lookback, name_of=get_name)
+    hot_stocks_cache.set(cache_key, records, ttl=hot_stocks_ttl(reference_date_str))
+    return reference_date_str, records
+
 @router.get("/hot-stocks")
-def get_hot_stocks():
-    """오늘 또는 가장 최근 영업일의 관심도가 높은 종목(신규 Top100 진입 또는 거래대금 급증)을 조회합니다."""
+async def get_hot_stocks(lookback: int = Query(DEFAULT_LOOKBACK, ge=1, le=20),
+                         surge_multiple: float = Query(DEFAULT_SURGE_MULTIPLE, gt=0),
+                         universe: str = Query("top100", pattern="^(top100|all)$"),
+                         format: str = Query("json", pattern="^(json|ndjson|sse)$")):
+    """오늘 또는 가장 최근 영업일의 관심도가 높은 종목(신규 Top100 진입 또는 거래대금 급증)을 조회합니다.
+
+    universe=all이면 Top 100 스냅샷 대신 로컬 시세 저장소의 전 종목을 대상으로 계산합니다.
+    format=ndjson 또는 sse이면 종목별 레코드를 스트리밍하고 마지막에 요약을 보냅니다.
+    """
     try:
         today_str = datetime.today().strftime('%Y%m%d')
-        reference_date_str = None
-        
-        today_data = get_firestore_data(today_str)
-        if today_data:
-            reference_date_str = today_str
+        if universe == "all":
+            reference_date_str, hot_stocks_result = await run_in_threadpool(_hot_stocks_from_market, today_str, lookback, surge_multiple)
         else:
-            print(f"Warning: Data for today ({today_str}) not found. Searching for the most recent business day data.")
-            potential_dates = get_previous_business_days(10, today_str) 
-            for date in potential_dates:
-                if get_firestore_data(date):
-                    reference_date_str = date
-                    print(f"Using data from the most recent business day: {reference_date_str}")
-                    break
-        
-        if not reference_date_str:
-            raise HTTPException(status_code=404, detail="최근 영업일의 Top 100 데이터가 없습니다. 먼저 스냅샷을 생성해주세요.")
-
-        previous_5_days_from_ref = get_previous_business_days(5, reference_date_str)
-        all_relevant_dates = [reference_date_str] + previous_5_days_from_ref
-        
-        daily_data = {}
-        for date in all_relevant_dates:
-            data = get_firestore_data(date)            
-            if data is not None:
-                daily_data[date] = {item['종목명']: item for item in data}
-            else:
-                daily_data[date] = {}
-
-        reference_stocks = daily_data.get(reference_date_str, {})
-        if not reference_stocks:
-             raise HTTPException(status_code=404, detail=f"{reference_date_str}의 Top 100 데이터가 없습니다.")
-
-        previous_business_day_str = previous_5_days_from_ref[0] 
-        previous_day_top100_names = set(daily_data.get(previous_business_day_str, {}).keys())
-        
-        hot_stocks_result = []
-
-        for stock_name, ref_day_info in reference_stocks.items():
-            is_new_entry = stock_name not in previous_day_top100_names
-            
-            past_values = []
-            for date in previous_5_days_from_ref:
-                stock_data_on_date = daily_data.get(date, {}).get(stock_name)
-                if stock_data_on_date:
-                    past_values.append(stock_data_on_date.get('거래대금', 0))
-            
-            avg_5_day_value = mean(past_values) if past_values else 0
-            ref_day_value = ref_day_info.get('거래대금', 0)
-            
-            is_value_surge = avg_5_day_value > 0 and ref_day_value >= 2 * avg_5_day_value
-
-            if is_new_entry or is_value_surge:
-                hot_stocks_result.append({
-                    "종목명": stock_name,
-                    "거래대금": ref_day_value,
-                    "거래량": ref_day_info.get('거래량', 0),
-                    "이전영업일Top100": not is_new_entry,
-                    "5일평균거래대금": avg_5_day_value,
-                    "거래대금배수(5일평균기준)": 0 if avg_5_day_value == 0 else ref_day_value/avg_5_day_value
-                })
+            reference_date_str, hot_stocks_result = await _hot_stocks_from_snapshots(today_str, lookback, surge_multiple)
+
+        if format != "json":
+            summary = {
+                "기준일": reference_date_str,
+                "종목수": len(hot_stocks_result),
+                "신규진입종목수": sum(1 for r in hot_stocks_result if not r["이전영업일Top100"])
+            }
+            return stream_records(hot_stocks_result, lambda: summary, format)
 
         if not hot_stocks_result:
             return {"message": f"{reference_date_str} 기준 조건에 맞는 관심 종목이 없습니다."}
-            
+
         return hot_stocks_result
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         print(f"Error fetching hot stocks: {e}")
-        raise HTTPException(status_code=500, detail=f"관심 종목 조회 중 오류 발생: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"관심 종목 조회 중 오류 발생: {e}")
+
+@router.get("/cache/stats")
+def get_cache_statistics():
+    """Top 100 스냅샷 및 관심 종목 캐시의 적중/실패 횟수를 조회합니다."""
+    return get_cache_stats()
\ No newline at end of file
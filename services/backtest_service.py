@@ -0,0 +1,163 @@
+import argparse
+import json
+from itertools import chain
+from datetime import date as DateObject, datetime
+
+import numpy as np
+import pandas as pd
+
+from routers.holidays import trading_calendar
+from services.ohlcv_store import get_market_table, get_market_tables, load_price_matrix
+from services.parallel_service import compute_columns
+from services.pullback_service import HIGH_WINDOW, MIN_BARS, RISE_VOLUME_WINDOW, compute_pullback_signals
+from services.trading_calendar import to_yyyymmdd
+
+DEFAULT_HORIZONS = (5, 10, 20)
+DEFAULT_UNIVERSE_SIZE = 100
+# 첫 평가일에도 모든 지표(ma60, 45일 고점 탐색, 고점 전 10일 거래량)가 채워지도록 확보하는 선행 구간
+WARMUP_BARS = MIN_BARS + HIGH_WINDOW + RISE_VOLUME_WINDOW
+
+CONDITION_KEYS = {
+    "조건1_정배열": "cond_aligned",
+    "조건2_ma20상승기울기": "cond_rising",
+    "조건3_최근상승이력(고점기준)": "cond_recent_high",
+    "조건4_ma20근접": "cond_near_ma20",
+    "조건5_거래량감소": "cond_volume_decreased",
+}
+
+
+def select_top_by_value(date: str, size: int) -> list[str]:
+    """지정된 날짜의 코스피 거래대금 상위 종목 티커를 반환합니다 (daily_top100과 같은 기준)."""
+    return _top_by_value(get_market_table(date), size)
+
+
+def _top_by_value(df: pd.DataFrame, size: int) -> list[str]:
+    """전 종목 시세 테이블에서 코스피 거래대금 상위 종목 티커를 고릅니다."""
+    if df.empty:
+        return []
+    df = df[df['시장'] == 'KOSPI']
+    return df.sort_values(by='거래대금', ascending=False).head(size).index.tolist()
+
+
+def _return_stats(returns: np.ndarray) -> dict:
+    """수익률 표본의 건수, 평균, 중앙값, 승률을 계산합니다."""
+    returns = returns[~np.isnan(returns)]
+    if len(returns) == 0:
+        return {"건수": 0, "평균수익률": None, "중앙수익률": None, "승률": None}
+    return {
+        "건수": int(len(returns)),
+        "평균수익률": round(float(returns.mean()), 6),
+        "중앙수익률": round(float(np.median(returns)), 6),
+        "승률": round(float((returns > 0).mean()), 4)
+    }
+
+
+def run_backtest(start_date_str: str, end_date_str: str, tickers: list[str] | None = None,
+                 universe_size: int = DEFAULT_UNIVERSE_SIZE, horizons: tuple[int, ...] = DEFAULT_HORIZONS,
+                 include_signals: bool = False) -> dict:
+    """기간 내 모든 영업일에 대해 눌림목 신호를 한 번에 계산하고 신호 적중률과 N일 후 수익률을 집계합니다."""
+    start_date = datetime.strptime(start_date_str, '%Y%m%d').date()
+    end_date = datetime.strptime(end_date_str, '%Y%m%d').date()
+    today = datetime.today().date()
+    if any(horizon <= 0 for horizon in horizons):
+        raise ValueError("수익률 계산 기간은 1일 이상이어야 합니다.")
+    max_horizon = max(horizons) if horizons else 0
+
+    eval_days = trading_calendar.business_days_between(start_date, end_date)
+    if len(eval_days) == 0:
+        raise ValueError(f"{start_date_str}~{end_date_str} 구간에 영업일이 없습니다.")
+
+    # 선행 구간 + 평가 구간 + 수익률 계산용 후행 구간을 한 번에 읽습니다.
+    warmup_days = trading_calendar.previous_business_days(WARMUP_BARS, start_date)[::-1]
+    # 종료일이 휴장일이어도 마지막 평가일 다음 영업일부터 수익률 계산 구간에 포함되도록 마지막 평가일 기준으로 자릅니다.
+    forward_days = trading_calendar.business_days_between(eval_days[-1].astype(DateObject), today)[1:max_horizon + 1]
+    all_days = to_yyyymmdd(np.concatenate([warmup_days, eval_days, forward_days]))
+
+    # 대상 종목을 지정하지 않으면 평가일마다 그날의 거래대금 상위 종목만 평가합니다 (이후 날짜의 정보를 쓰지 않도록).
+    universe_by_date = None
+    if not tickers:
+        tables = get_market_tables(to_yyyymmdd(eval_days))
+        universe_by_date = {date: _top_by_value(df, universe_size) for date, df in tables.items()}
+        tickers = list(dict.fromkeys(chain.from_iterable(universe_by_date.values())))
+    if not tickers:
+        raise ValueError("백테스트 대상 종목이 없습니다.")
+
+    matrices = load_price_matrix(all_days)
+    close_df = matrices['종가'].reindex(columns=tickers)
+    volume_df = matrices['거래량'].reindex(columns=tickers)
+    dates = close_df.index.values.astype('datetime64[D]')
+    close = close_df.to_numpy(dtype=float)
+
+    # 종목(열)끼리 독립인 계산이므로 ANALYSIS_WORKERS가 설정되어 있으면 프로세스 풀에서 나눠 계산합니다.
+    signals = compute_columns(compute_pullback_signals, [close, volume_df.to_numpy(dtype=float)], (dates,))
+
+    rows = np.flatnonzero((dates >= eval_days[0]) & (dates <= eval_days[-1]))
+    valid = signals["sufficient"][rows]
+    if universe_by_date is not None:
+        columns = {ticker: i for i, ticker in enumerate(tickers)}
+        in_universe = np.zeros(valid.shape, dtype=bool)
+        for r, date in enumerate(to_yyyymmdd(dates[rows])):
+            in_universe[r, [columns[ticker] for ticker in universe_by_date.get(date, [])]] = True
+        valid &= in_universe
+    is_pullback = signals["is_pullback"][rows] & valid
+
+    forward_returns = {}
+    for horizon in horizons:
+        future = np.full(close.shape, np.nan)
+        future[:-horizon] = close[horizon:]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            forward_returns[horizon] = (future / close - 1)[rows]
+
+    evaluated = int(valid.sum())
+    signal_count = int(is_pullback.sum())
+    report = {
+        "시작일": start_date_str,
+        "종료일": end_date_str,
+        "평가일수": int(len(rows)),
+        "종목수": len(tickers),
+        "평가건수": evaluated,
+        "신호건수": signal_count,
+        "신호비율": round(signal_count / evaluated, 4) if evaluated else None,
+        "조건별충족률": {
+            name: round(float((signals[key][rows] & valid).sum() / evaluated), 4) if evaluated else None
+            for name, key in CONDITION_KEYS.items()
+        },
+        "수익률": {
+            f"{horizon}일": {
+                "신호": _return_stats(returns[is_pullback]),
+                "전체": _return_stats(returns[valid])
+            }
+            for horizon, returns in forward_returns.items()
+        }
+    }
+
+    if include_signals:
+        row_idx, col_idx = np.nonzero(is_pullback)
+        report["signals"] = [
+            {
+                "date": str(dates[rows[r]]).replace('-', ''),
+                "ticker": tickers[c],
+                "score": float(signals["score"][rows[r], c]),
+                **{
+                    f"{horizon}일수익률": None if np.isnan(forward_returns[horizon][r, c]) else round(float(forward_returns[horizon][r, c]), 6)
+                    for horizon in horizons
+                }
+            }
+            for r, c in zip(row_idx, col_idx)
+        ]
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="눌림목 신호 백테스트")
+    parser.add_argument("--start", required=True, help="시작일 (YYYYMMDD)")
+    parser.add_argument("--end", required=True, help="종료일 (YYYYMMDD)")
+    parser.add_argument("--tickers", nargs="*", help="대상 티커 (생략 시 평가일별 거래대금 상위 종목)")
+    parser.add_argument("--universe-size", type=int, default=DEFAULT_UNIVERSE_SIZE)
+    parser.add_argument("--horizons", type=int, nargs="*", default=list(DEFAULT_HORIZONS))
+    parser.add_argument("--signals", action="store_true", help="개별 신호 목록 포함")
+    args = parser.parse_args()
+
+    result = run_backtest(args.start, args.end, args.tickers, args.universe_size, tuple(args.horizons), args.signals)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시에 값이 없음을 나타내는 표식 (None 자체도 캐시할 수 있도록 별도 객체 사용)
+MISSING = object()
+
+
+class TTLCache:
+    """스레드 안전한 LRU 캐시. 항목마다 만료 시간(초)을 지정할 수 있으며, 적중/실패 횟수를 집계합니다."""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        """키에 해당하는 값을 반환합니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None):
+        """값을 저장합니다. ttl이 None이면 LRU에서 밀려나거나 무효화될 때까지 유지됩니다."""
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """지정된 키의 항목을 제거합니다."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """모든 항목을 제거합니다."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """캐시 크기와 적중률을 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None
+            }
\ No newline at end of file
@@ -0,0 +1,140 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable
+
+
+class TokenBucket:
+    """초당 rate개의 토큰이 채워지는 토큰 버킷. 토큰이 없으면 채워질 때까지 대기합니다."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 1) if self.calls else None,
+            "max_ms": round(self.max_seconds * 1000, 1)
+        }
+
+
+class FetchScheduler:
+    """외부 시세 조회를 공유 스레드 풀에서 실행하는 스케줄러.
+
+    - 토큰 버킷으로 초당 호출 수를 제한합니다.
+    - 같은 키로 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 함께 기다립니다.
+    - 실패 시 지수 백오프로 재시도합니다.
+    - 호출 함수별 지연 시간과 실패/재시도/병합 횟수를 집계합니다.
+    """
+
+    def __init__(self, max_workers: int, rate: float, burst: int, max_retries: int, backoff_seconds: float):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="krx-fetch")
+        self._bucket = TokenBucket(rate, burst)
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(_CallStats)
+
+    def _run(self, name: str, fn: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            stats = self._stats[name]
+        for attempt in range(self._max_retries + 1):
+            self._bucket.acquire()
+            started_at = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                error = None
+            except Exception as e:
+                error = e
+            elapsed = time.monotonic() - started_at
+
+            with self._lock:
+                stats.calls += 1
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                if error is not None:
+                    if attempt == self._max_retries:
+                        stats.errors += 1
+                    else:
+                        stats.retries += 1
+
+            if error is None:
+                return result
+            if attempt == self._max_retries:
+                raise error
+            print(f"Warning: {name} failed ({error}), retrying ({attempt + 1}/{self._max_retries}).")
+            time.sleep(self._backoff_seconds * (2 ** attempt) * (1 + random.random()))
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        """fn(*args, **kwargs)를 예약합니다. 같은 key의 호출이 진행 중이면 해당 Future를 반환합니다."""
+        name = getattr(fn, '__name__', str(fn))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats[name].coalesced += 1
+                return future
+            future = self._executor.submit(self._run, name, fn, args, kwargs)
+            self._inflight[key] = future
+
+        def _done(_):
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        future.add_done_callback(_done)
+        return future
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """fn을 스케줄러를 통해 실행하고 결과를 기다립니다."""
+        return self.submit(key, fn, *args, **kwargs).result()
+
+    def stats(self) -> dict:
+        """호출 함수별 통계와 현재 진행 중인 호출 수를 반환합니다."""
+        with self._lock:
+            return {
+                "inflight": len(self._inflight),
+                "calls": {name: stats.to_dict() for name, stats in self._stats.items()}
+            }
+
+
+# pykrx(KRX) 호출용 공유 스케줄러
+krx_scheduler = FetchScheduler(
+    max_workers=int(os.getenv('KRX_FETCH_WORKERS', '4')),
+    rate=float(os.getenv('KRX_RATE_PER_SECOND', '5')),
+    burst=int(os.getenv('KRX_RATE_BURST', '5')),
+    max_retries=int(os.getenv('KRX_MAX_RETRIES', '3')),
+    backoff_seconds=float(os.getenv('KRX_BACKOFF_SECONDS', '0.5')),
+)
@@ -1,11 +1,114 @@
-from database import db
+import os
+from datetime import datetime
+
+from database import async_db, db
+from services.cache_service import MISSING, TTLCache
+from services.metrics_service import span
+
+TOP100_COLLECTION = 'daily_top100'
+# Firestore WriteBatch 한 번에 담을 수 있는 최대 작업 수
+MAX_BATCH_OPERATIONS = 500
+
+# 당일 데이터와 아직 없는 날짜는 짧게만 캐시합니다.
+SHORT_TTL_SECONDS = 60
+# 과거 날짜의 스냅샷은 거의 바뀌지 않지만, 다른 워커의 재생성·백필·정리는 이 프로세스의 캐시를 무효화하지 못하므로
+# 이 시간(초)이 지나면 다시 읽습니다.
+SNAPSHOT_CACHE_TTL_SECONDS = float(os.getenv('SNAPSHOT_CACHE_TTL_SECONDS', '600'))
+snapshot_cache = TTLCache('daily_top100', maxsize=256)
+hot_stocks_cache = TTLCache('hot_stocks', maxsize=64)
+
+def _snapshot_ttl(date: str, data: list | None) -> float:
+    if data is None or date >= datetime.today().strftime('%Y%m%d'):
+        return SHORT_TTL_SECONDS
+    return SNAPSHOT_CACHE_TTL_SECONDS
+
+def hot_stocks_ttl(reference_date: str) -> float:
+    """관심 종목 결과의 캐시 유지 시간을 반환합니다 (당일 기준이면 짧게)."""
+    return SHORT_TTL_SECONDS if reference_date >= datetime.today().strftime('%Y%m%d') else SNAPSHOT_CACHE_TTL_SECONDS
+
+def invalidate_snapshot(date: str):
+    """스냅샷이 새로 저장되거나 삭제된 날짜의 캐시와, 이를 참조하는 관심 종목 결과를 무효화합니다.
+
+    이 프로세스의 캐시만 무효화하며, 다른 워커는 SNAPSHOT_CACHE_TTL_SECONDS가 지나면 새 데이터를 읽습니다.
+    """
+    snapshot_cache.invalidate(date)
+    hot_stocks_cache.clear()
 
 def get_firestore_data(date: str) -> list | None:
     """지정된 날짜의 Top 100 데이터를 Firestore에서 조회합니다."""
-    doc_ref = db.collection('daily_top100').document(date)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict().get('data', [])
-    else:
+    cached = snapshot_cache.get(date)
+    if cached is not MISSING:
+        return cached
+
+    doc_ref = db.collection(TOP100_COLLECTION).document(date)
+    with span("firestore.get"):
+        doc = doc_ref.get()
+    data = doc.to_dict().get('data', []) if doc.exists else None
+    snapshot_cache.set(date, data, ttl=_snapshot_ttl(date, data))
+    if data is None:
         print(f"Warning: Data for {date} not found in Firestore.")
-        return None
\ No newline at end of file
+    return data
+
+async def get_firestore_data_many(dates: list[str]) -> dict[str, list | None]:
+    """여러 날짜의 Top 100 데이터를 한 번의 일괄 조회(get_all)로 가져옵니다. 없는 날짜는 None입니다."""
+    results = {}
+    to_fetch = []
+    for date in dict.fromkeys(dates):
+        cached = snapshot_cache.get(date)
+        if cached is MISSING:
+            to_fetch.append(date)
+        else:
+            results[date] = cached
+    if not to_fetch:
+        return results
+
+    fetched = {date: None for date in to_fetch}
+    collection_ref = async_db.collection(TOP100_COLLECTION)
+    doc_refs = [collection_ref.document(date) for date in to_fetch]
+    with span("firestore.get_all"):
+        async for doc in async_db.get_all(doc_refs):
+            if doc.exists:
+                fetched[doc.id] = doc.to_dict().get('data', [])
+
+    for date, data in fetched.items():
+        snapshot_cache.set(date, data, ttl=_snapshot_ttl(date, data))
+    results.update(fetched)
+
+    missing = [date for date, data in fetched.items() if data is None]
+    if missing:
+        print(f"Warning: Data for {', '.join(missing)} not found in Firestore.")
+    return results
+
+async def get_firestore_data_async(date: str) -> list | None:
+    """지정된 날짜의 Top 100 데이터를 비동기로 조회합니다."""
+    return (await get_firestore_data_many([date]))[date]
+
+def get_cache_stats() -> dict:
+    """스냅샷 및 관심 종목 캐시의 적중 통계를 반환합니다."""
+    return {cache.name: cache.stats() for cache in (snapshot_cache, hot_stocks_cache)}
+
+def list_snapshot_ids_before(cutoff_date: str) -> list[str]:
+    """문서 ID(YYYYMMDD)가 기준일보다 앞선 Top 100 스냅샷 ID만 키 범위 조회로 가져옵니다 (필드 데이터는 읽지 않음)."""
+    from google.cloud.firestore import FieldFilter
+    from google.cloud.firestore_v1.field_path import FieldPath
+
+    collection_ref = db.collection(TOP100_COLLECTION)
+    query = (
+        collection_ref
+        .where(filter=FieldFilter(FieldPath.document_id(), '<', collection_ref.document(cutoff_date)))
+        .select([FieldPath.document_id()])
+    )
+    return [doc.id for doc in query.stream()]
+
+def delete_snapshots(dates: list[str]) -> int:
+    """Top 100 스냅샷 문서를 WriteBatch 단위로 묶어 삭제하고 삭제한 문서 수를 반환합니다."""
+    collection_ref = db.collection(TOP100_COLLECTION)
+    for i in range(0, len(dates), MAX_BATCH_OPERATIONS):
+        chunk = dates[i:i + MAX_BATCH_OPERATIONS]
+        batch = db.batch()
+        for date in chunk:
+            batch.delete(collection_ref.document(date))
+        batch.commit()
+        for date in chunk:
+            invalidate_snapshot(date)
+    return len(dates)
\ No newline at end of file
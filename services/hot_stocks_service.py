@@ -0,0 +1,101 @@
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LOOKBACK = 5
+DEFAULT_SURGE_MULTIPLE = 2.0
+# 전 종목 대상일 때 'Top100 진입' 판정에 사용하는 거래대금 순위
+TOP_RANK = 100
+
+
+def snapshot_matrices(daily_records: dict[str, list[dict] | None], dates: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """날짜별 Top 100 스냅샷 레코드를 종목명×날짜의 거래대금·거래량 행렬로 정렬합니다.
+
+    행은 기준일 종목, 열 순서는 dates 순서(기준일, 직전 영업일, ...)이며 해당 날짜에 없는 종목은 NaN입니다.
+    """
+    frames = {}
+    for date in dates:
+        records = daily_records.get(date) or []
+        frames[date] = pd.DataFrame(records, columns=['종목명', '거래량', '거래대금']).drop_duplicates('종목명').set_index('종목명')
+
+    # 관심 종목은 기준일 종목 중에서만 나오므로 기준일 종목 순서(거래대금 내림차순)로 정렬합니다.
+    index = frames[dates[0]].index
+    value = pd.DataFrame({date: frames[date]['거래대금'].reindex(index) for date in dates}, index=index, dtype=float)
+    volume = pd.DataFrame({date: frames[date]['거래량'].reindex(index) for date in dates}, index=index, dtype=float)
+    return value, volume
+
+
+def market_matrices(tables: dict[str, pd.DataFrame], dates: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """날짜별 전 종목 시세 테이블을 티커×날짜의 거래대금·거래량 행렬로 정렬합니다.
+
+    시세가 없는 날(달력에 없는 휴장일 등)은 열에서 빼므로, 직전 영업일 열은 실제로 장이 열린 직전 날짜입니다.
+    """
+    dates = [date for date in dates if not tables[date].empty]
+    value = pd.DataFrame({date: tables[date]['거래대금'] for date in dates}, dtype=float)
+    volume = pd.DataFrame({date: tables[date]['거래량'] for date in dates}, dtype=float)
+    order = value[dates[0]].sort_values(ascending=False, na_position='last').index
+    return value.reindex(order), volume.reindex(order)
+
+
+def compute_hot_stocks(value: pd.DataFrame, volume: pd.DataFrame, lookback: int = DEFAULT_LOOKBACK,
+                       surge_multiple: float = DEFAULT_SURGE_MULTIPLE, top_rank: int | None = None) -> pd.DataFrame:
+    """신규 Top100 진입 여부와 N일 평균 대비 거래대금 급증 여부를 열 단위 연산으로 계산합니다.
+
+    value/volume은 종목×날짜 행렬이며 첫 열이 기준일, 다음 열부터 직전 영업일 순서입니다.
+    top_rank를 지정하면 날짜별 거래대금 순위가 top_rank 이내인 종목을 Top100 편입 종목으로 봅니다
+    (지정하지 않으면 해당 날짜 행렬에 값이 있는 종목이 편입 종목입니다).
+    반환값은 관심 종목만 남긴 DataFrame입니다.
+    """
+    ref_value = value.iloc[:, 0].to_numpy()
+    past_value = value.iloc[:, 1:lookback + 1].to_numpy()
+
+    if top_rank is None:
+        in_reference = ~np.isnan(ref_value)
+        in_previous = ~np.isnan(value.iloc[:, 1].to_numpy()) if value.shape[1] > 1 else np.zeros(len(value), dtype=bool)
+    else:
+        ranks = value.iloc[:, :2].rank(ascending=False, method='first').to_numpy()
+        in_reference = ranks[:, 0] <= top_rank
+        in_previous = ranks[:, 1] <= top_rank if value.shape[1] > 1 else np.zeros(len(value), dtype=bool)
+
+    # 기준 구간에 값이 있는 날만으로 평균을 냅니다 (값이 없으면 0).
+    counts = (~np.isnan(past_value)).sum(axis=1)
+    sums = np.nansum(past_value, axis=1)
+    avg_value = np.divide(sums, counts, out=np.zeros(len(value)), where=counts > 0)
+
+    has_value = ~np.isnan(ref_value)
+    ref_filled = np.nan_to_num(ref_value, nan=0.0)
+    is_new_entry = in_reference & ~in_previous
+    is_value_surge = has_value & (avg_value > 0) & (ref_filled >= surge_multiple * avg_value)
+    ratio = np.divide(ref_filled, avg_value, out=np.zeros(len(value)), where=avg_value > 0)
+
+    hot = is_new_entry | is_value_surge
+    return pd.DataFrame({
+        "거래대금": ref_filled,
+        "거래량": np.nan_to_num(volume.iloc[:, 0].to_numpy(), nan=0.0),
+        "이전영업일Top100": in_previous,
+        "평균거래대금": avg_value,
+        "거래대금배수": ratio,
+    }, index=value.index)[hot]
+
+
+def to_records(hot: pd.DataFrame, lookback: int, name_of: Callable[[str], str | None] | None = None) -> list[dict]:
+    """관심 종목 DataFrame을 API 응답 레코드 목록으로 변환합니다.
+
+    name_of를 지정하면 행 키를 티커로 보고 종목명을 조회해 함께 넣습니다.
+    """
+    records = []
+    for key, row in zip(hot.index, hot.itertuples(index=False)):
+        if name_of is None:
+            record = {"종목명": key}
+        else:
+            record = {"종목명": name_of(key) or key, "티커": key}
+        record.update({
+            "거래대금": int(row[0]),
+            "거래량": int(row[1]),
+            "이전영업일Top100": bool(row[2]),
+            f"{lookback}일평균거래대금": float(row[3]),
+            f"거래대금배수({lookback}일평균기준)": float(row[4])
+        })
+        records.append(record)
+    return records
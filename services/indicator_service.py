@@ -0,0 +1,354 @@
+import json
+import math
+import os
+import re
+import tempfile
+from collections import deque
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from services.ohlcv_store import get_market_table, is_closed_date, load_ticker_history, read_partition
+from services.pullback_service import (
+    CONDITION_COUNT, HIGH_MA20_RATIO, HIGH_MAX_DAYS, HIGH_MIN_DAYS, HIGH_WINDOW, LOOKBACK_CALENDAR_DAYS, MIN_BARS,
+    MIN_SATISFIED, NEAR_MA20_LOWER, NEAR_MA20_UPPER, RISE_VOLUME_WINDOW, VOLUME_DECLINE_RATIO
+)
+from services.stock_service import get_business_days_between, get_market_ohlcv
+
+# 종목별 지표 상태 파일 디렉터리 ({티커}.json)
+INDICATOR_STATE_DIR = os.getenv(
+    'INDICATOR_STATE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'indicators')
+)
+# 링 버퍼 길이: ma60, 직전 45일 고점 탐색, 고점 전 10일 거래량을 모두 계산할 수 있는 길이
+BUFFER_SIZE = 64
+# 이보다 오래 갱신되지 않은 상태는 증분 갱신 대신 다시 만듭니다.
+MAX_ADVANCE_BARS = BUFFER_SIZE
+# 종목 코드 형식 (숫자·영대문자 6자리, 상태 파일 이름으로 쓰입니다)
+TICKER_PATTERN = re.compile(r'[0-9A-Z]{6}')
+# 로컬 파티션이 없는 날짜를 채울 때, 갱신 대상 종목이 이보다 많으면 종목별 조회 대신 전 종목 시세를 받습니다.
+MARKET_FETCH_THRESHOLD = 20
+
+
+class IndicatorState:
+    """종목별 눌림목 지표 상태.
+
+    최근 BUFFER_SIZE개 봉의 날짜·종가·거래량·ma20을 링 버퍼로, 5/20/60일 종가 합과 3일 거래량 합을
+    누적합으로 유지하여 새 거래일 봉을 O(1)로 반영합니다.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.dates = deque(maxlen=BUFFER_SIZE)
+        self.closes = deque(maxlen=BUFFER_SIZE)
+        self.volumes = deque(maxlen=BUFFER_SIZE)
+        self.ma20s = deque(maxlen=BUFFER_SIZE)
+        self.sum5 = 0
+        self.sum20 = 0
+        self.sum60 = 0
+        self.volume_sum3 = 0
+        self.count = 0
+
+    @property
+    def last_date(self) -> str | None:
+        return self.dates[-1] if self.dates else None
+
+    def advance(self, date: str, close, volume):
+        """새 거래일 봉 하나를 반영합니다."""
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{self.ticker}: {date}는 마지막 반영일 {self.last_date} 이후가 아닙니다.")
+
+        # 창에서 빠지는 값을 먼저 뺍니다. (버퍼 길이가 60을 넘으므로 빠지는 값은 항상 버퍼 안에 있습니다.)
+        n = len(self.closes)
+        if n >= 5:
+            self.sum5 -= self.closes[-5]
+        if n >= 20:
+            self.sum20 -= self.closes[-20]
+        if n >= 60:
+            self.sum60 -= self.closes[-60]
+        if n >= 3:
+            self.volume_sum3 -= self.volumes[-3]
+
+        self.dates.append(date)
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.sum5 += close
+        self.sum20 += close
+        self.sum60 += close
+        self.volume_sum3 += volume
+        self.count += 1
+        self.ma20s.append(self.sum20 / 20 if self.count >= 20 else math.nan)
+
+    @classmethod
+    def from_history(cls, ticker: str, df: pd.DataFrame) -> 'IndicatorState':
+        """일별 시세 DataFrame(인덱스: 날짜, 컬럼: 종가/거래량)으로 상태를 만듭니다."""
+        state = cls(ticker)
+        for date, close, volume in zip(df.index, df['종가'].tolist(), df['거래량'].tolist()):
+            state.advance(pd.Timestamp(date).strftime('%Y%m%d'), close, volume)
+        return state
+
+    def _mean(self, total, window: int) -> float:
+        return total / window if self.count >= window else math.nan
+
+    def _recent_high(self, end: int, date_str: str) -> tuple[bool, float]:
+        """버퍼 위치 end의 봉 기준으로 (최근 상승 이력 여부, 고점 직전 10일 평균 거래량)을 구합니다.
+
+        직전 45거래일 중 종가가 ma20의 1.05배를 넘은 마지막 날을 찾습니다 (최대 45회 비교).
+        end는 버퍼 길이와 같을 수 있으며, 이때는 아직 버퍼에 넣지 않은 장중 봉을 기준으로 합니다.
+        """
+        high_loc = None
+        for i in range(end - 1, max(end - HIGH_WINDOW, 0) - 1, -1):
+            if self.closes[i] > self.ma20s[i] * HIGH_MA20_RATIO:
+                high_loc = i
+                break
+
+        if high_loc is None:
+            return False, 0
+        days_since_high = (datetime.strptime(date_str, '%Y%m%d') - datetime.strptime(self.dates[high_loc], '%Y%m%d')).days
+        if not HIGH_MIN_DAYS <= days_since_high <= HIGH_MAX_DAYS:
+            return False, 0
+        if high_loc < RISE_VOLUME_WINDOW:
+            return True, 0
+        return True, sum(self.volumes[i] for i in range(high_loc - RISE_VOLUME_WINDOW, high_loc)) / RISE_VOLUME_WINDOW
+
+    def evaluate(self, date_str: str | None = None) -> dict:
+        """마지막 반영일 기준으로 check_pullback과 같은 형식의 판정 결과를 반환합니다."""
+        if self.count < MIN_BARS:
+            return {"is_pullback": False, "reason": f"데이터 부족 (최소 {MIN_BARS}일 필요)"}
+
+        last = len(self.closes) - 1
+        recent_high_found, avg_vol_rise = self._recent_high(last, self.dates[last])
+        return build_result(
+            date_str or self.last_date,
+            close=self.closes[-1],
+            ma5=self._mean(self.sum5, 5),
+            ma20=self._mean(self.sum20, 20),
+            ma60=self._mean(self.sum60, 60),
+            avg_vol_3=self._mean(self.volume_sum3, 3),
+            ma20_rising=bool(self.ma20s[-1] - self.ma20s[-3] > 0),
+            recent_high_found=recent_high_found,
+            avg_vol_rise=avg_vol_rise
+        )
+
+    def preview(self, date_str: str) -> 'IntradayPreview':
+        """마감 봉까지 반영된 이 상태 다음 거래일(date_str)의 장중 봉을 O(1)로 판정하는 객체를 만듭니다."""
+        return IntradayPreview(self, date_str)
+
+    def to_dict(self) -> dict:
+        return {
+            "ticker": self.ticker,
+            "dates": list(self.dates),
+            "closes": list(self.closes),
+            "volumes": list(self.volumes),
+            "ma20s": [None if math.isnan(v) else v for v in self.ma20s],
+            "sum5": self.sum5,
+            "sum20": self.sum20,
+            "sum60": self.sum60,
+            "volume_sum3": self.volume_sum3,
+            "count": self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IndicatorState':
+        state = cls(data['ticker'])
+        state.dates.extend(data['dates'])
+        state.closes.extend(data['closes'])
+        state.volumes.extend(data['volumes'])
+        state.ma20s.extend(math.nan if v is None else v for v in data['ma20s'])
+        state.sum5 = data['sum5']
+        state.sum20 = data['sum20']
+        state.sum60 = data['sum60']
+        state.volume_sum3 = data['volume_sum3']
+        state.count = data['count']
+        return state
+
+
+def build_result(date_str: str, close, ma5: float, ma20: float, ma60: float, avg_vol_3: float, ma20_rising: bool,
+                 recent_high_found: bool, avg_vol_rise: float) -> dict:
+    """지표 값으로 눌림목 5개 조건을 판정해 check_pullback과 같은 형식의 결과를 만듭니다."""
+    cond1_ma_aligned = bool(ma5 > ma20 > ma60)
+    cond3_near_ma20 = bool(ma20 * NEAR_MA20_LOWER <= close <= ma20 * NEAR_MA20_UPPER)
+    cond4_volume_decreased = bool(recent_high_found and avg_vol_rise > 0 and avg_vol_3 < avg_vol_rise * VOLUME_DECLINE_RATIO)
+
+    conditions = [cond1_ma_aligned, ma20_rising, recent_high_found, cond3_near_ma20, cond4_volume_decreased]
+    satisfied = sum(conditions)
+
+    return {
+        "is_pullback": satisfied >= MIN_SATISFIED,
+        "score": round(satisfied / CONDITION_COUNT, 2),
+        "details": {
+            "기준일": date_str,
+            "종가": close,
+            "ma5": ma5,
+            "ma20": ma20,
+            "ma60": ma60,
+            "최근3일평균거래량": avg_vol_3,
+            "상승시평균거래량": avg_vol_rise,
+            "조건1_정배열": cond1_ma_aligned,
+            "조건2_ma20상승기울기": ma20_rising,
+            "조건3_최근상승이력(고점기준)": recent_high_found,
+            "조건4_ma20근접": cond3_near_ma20,
+            "조건5_거래량감소": cond4_volume_decreased,
+            "조건_만족도": f"{satisfied}/{CONDITION_COUNT}"
+        }
+    }
+
+
+class IntradayPreview:
+    """마감 봉 상태를 고정해 두고 당일 장중 봉(현재가·누적 거래량)만 바꿔 가며 판정합니다.
+
+    장중 봉에 의존하지 않는 값(창에서 빠지지 않는 종가·거래량 합, 이틀 전 ma20, 직전 45거래일 고점과
+    상승 시 평균 거래량)을 만들 때 한 번 계산해 두므로, 체결마다의 판정은 O(1)입니다.
+    결과는 상태를 복사해 advance(date_str, price, volume) 한 뒤 evaluate()한 것과 같습니다.
+    """
+
+    def __init__(self, state: IndicatorState, date_str: str):
+        if state.last_date is not None and date_str <= state.last_date:
+            raise ValueError(f"{state.ticker}: {date_str}는 마지막 반영일 {state.last_date} 이후가 아닙니다.")
+        self.ticker = state.ticker
+        self.date = date_str
+        self.base_date = state.last_date
+        self.count = state.count + 1
+
+        closes, volumes = state.closes, state.volumes
+        n = len(closes)
+        # advance()와 같은 순서로 창에서 빠지는 값을 미리 빼 둡니다.
+        self.sum5 = state.sum5 - (closes[-5] if n >= 5 else 0)
+        self.sum20 = state.sum20 - (closes[-20] if n >= 20 else 0)
+        self.sum60 = state.sum60 - (closes[-60] if n >= 60 else 0)
+        self.volume_sum3 = state.volume_sum3 - (volumes[-3] if n >= 3 else 0)
+        self.prev_ma20 = state.ma20s[-2] if n >= 2 else math.nan
+        self.recent_high_found, self.avg_vol_rise = state._recent_high(n, date_str) if n else (False, 0)
+
+    def evaluate(self, price, volume) -> dict:
+        """현재가와 당일 누적 거래량으로 장중 봉을 판정합니다."""
+        if self.count < MIN_BARS:
+            return {"is_pullback": False, "reason": f"데이터 부족 (최소 {MIN_BARS}일 필요)"}
+
+        ma20 = (self.sum20 + price) / 20
+        return build_result(
+            self.date,
+            close=price,
+            ma5=(self.sum5 + price) / 5,
+            ma20=ma20,
+            ma60=(self.sum60 + price) / 60,
+            avg_vol_3=(self.volume_sum3 + volume) / 3,
+            ma20_rising=bool(ma20 - self.prev_ma20 > 0),
+            recent_high_found=self.recent_high_found,
+            avg_vol_rise=self.avg_vol_rise
+        )
+
+
+def is_valid_ticker(ticker: str) -> bool:
+    """종목 코드 형식(숫자·영대문자 6자리)인지 확인합니다."""
+    return isinstance(ticker, str) and TICKER_PATTERN.fullmatch(ticker) is not None
+
+
+def _state_path(ticker: str) -> str:
+    if not is_valid_ticker(ticker):
+        raise ValueError(f"올바르지 않은 종목 코드입니다: {ticker}")
+    return os.path.join(INDICATOR_STATE_DIR, f"{ticker}.json")
+
+
+def load_state(ticker: str) -> IndicatorState | None:
+    """저장된 지표 상태를 읽습니다. 없거나 읽을 수 없으면 None을 반환합니다."""
+    path = _state_path(ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return IndicatorState.from_dict(json.load(f))
+    except Exception as e:
+        print(f"Warning: Could not read indicator state for {ticker}: {e}")
+        return None
+
+
+def save_state(state: IndicatorState):
+    """지표 상태를 파일로 저장합니다. 장이 마감되지 않은 날의 봉이 포함된 상태는 저장하지 않습니다."""
+    if state.last_date is None or not is_closed_date(state.last_date):
+        return
+    os.makedirs(INDICATOR_STATE_DIR, exist_ok=True)
+    path = _state_path(state.ticker)
+    # 같은 종목을 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 저장마다 고유한 임시 파일을 씁니다.
+    fd, tmp_path = tempfile.mkstemp(dir=INDICATOR_STATE_DIR, prefix=f".{state.ticker}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _bar(table: pd.DataFrame, ticker: str) -> tuple | None:
+    if table.empty or ticker not in table.index:
+        return None
+    return table.at[ticker, '종가'].item(), table.at[ticker, '거래량'].item()
+
+
+def advance_states(tickers: list[str], date_str: str) -> dict[str, IndicatorState | None]:
+    """종목별 저장 상태를 기준일까지 증분 갱신합니다.
+
+    상태가 없거나, 기준일보다 앞서 있거나, 너무 오래되어 증분 갱신할 수 없는 종목은 None입니다.
+    갱신에 필요한 날짜별 전 종목 시세는 한 번씩만 읽어 모든 종목에 공유합니다.
+    """
+    states = {ticker: load_state(ticker) for ticker in tickers}
+    pending = {}
+    for ticker, state in states.items():
+        if state is None or state.last_date > date_str:
+            states[ticker] = None
+            continue
+        next_dates = get_business_days_between(state.last_date, date_str)[1:]
+        if len(next_dates) > MAX_ADVANCE_BARS:
+            states[ticker] = None
+        elif next_dates:
+            pending[ticker] = next_dates
+
+    use_market_tables = len(pending) > MARKET_FETCH_THRESHOLD
+    tables = {}
+    for ticker, next_dates in pending.items():
+        state = states[ticker]
+        for date in next_dates:
+            if date not in tables:
+                tables[date] = read_partition(date)
+                if tables[date] is None and use_market_tables:
+                    tables[date] = get_market_table(date)
+
+        if all(tables[date] is not None for date in next_dates):
+            bars = [(date, _bar(tables[date], ticker)) for date in next_dates]
+        else:
+            # 로컬 파티션이 없으면 해당 종목의 누락 구간만 조회합니다.
+            df = get_market_ohlcv(ticker, next_dates[0], date_str)
+            bars = [
+                (pd.Timestamp(date).strftime('%Y%m%d'), (close, volume))
+                for date, close, volume in zip(df.index, df['종가'].tolist(), df['거래량'].tolist())
+            ]
+
+        for date, bar in bars:
+            if bar is not None:
+                state.advance(date, *bar)
+        save_state(state)
+    return states
+
+
+def build_state(ticker: str, date_str: str) -> IndicatorState | None:
+    """기준일까지 반영된 지표 상태를 반환합니다.
+
+    저장 상태를 증분 갱신할 수 없으면 기준일까지의 일별 시세(로컬 저장소 우선)로 새로 만들어 저장합니다.
+    시세가 없으면 None을 반환합니다.
+    """
+    state = advance_states([ticker], date_str)[ticker]
+    if state is not None:
+        return state
+
+    start_date = (datetime.strptime(date_str, '%Y%m%d') - timedelta(days=LOOKBACK_CALENDAR_DAYS)).strftime('%Y%m%d')
+    df = load_ticker_history(ticker, get_business_days_between(start_date, date_str))
+    if df is None:
+        df = get_market_ohlcv(ticker, start_date, date_str)
+    if df is None or df.empty:
+        return None
+
+    state = IndicatorState.from_history(ticker, df)
+    save_state(state)
+    return state
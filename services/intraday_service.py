@@ -0,0 +1,225 @@
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from routers.holidays import trading_calendar
+from services.indicator_service import IntradayPreview, advance_states, build_state
+from services.ohlcv_store import is_closed_date
+from services.trading_calendar import to_yyyymmdd
+
+# 장중 시세 입력 (queue: 프로세스 내 큐, file:<경로>: 외부 수집기가 한 줄씩 추가하는 NDJSON 파일)
+INTRADAY_FEED = os.getenv('INTRADAY_FEED', 'queue')
+# 시세 입력을 확인하는 간격(초)
+INTRADAY_POLL_SECONDS = float(os.getenv('INTRADAY_POLL_SECONDS', '1.0'))
+# 한 번에 감시할 수 있는 최대 종목 수
+MAX_WATCHED_TICKERS = 500
+
+
+class PriceFeed(ABC):
+    """장중 체결 시세 입력. poll()은 마지막 호출 이후 들어온 (티커, 현재가, 당일 누적 거래량, 시각) 목록을 반환합니다."""
+
+    @abstractmethod
+    def poll(self) -> list[tuple]:
+        ...
+
+
+class QueuePriceFeed(PriceFeed):
+    """프로세스 내 큐로 시세를 받는 입력 (POST /pullback/intraday/ticks, 테스트용)."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def push(self, ticker: str, price, volume, timestamp: str | None = None):
+        self._queue.put((ticker, price, volume, timestamp or datetime.now().isoformat(timespec='seconds')))
+
+    def poll(self) -> list[tuple]:
+        ticks = []
+        while True:
+            try:
+                ticks.append(self._queue.get_nowait())
+            except queue.Empty:
+                return ticks
+
+
+class FilePriceFeed(PriceFeed):
+    """외부 수집기가 추가하는 NDJSON 파일({"ticker", "price", "volume", "time"} 한 줄씩)을 이어서 읽는 입력.
+
+    마지막으로 읽은 위치를 기억해 새로 추가된 줄만 읽으며, 아직 줄바꿈이 없는 마지막 줄은 다음 호출로 미룹니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = 0
+
+    def poll(self) -> list[tuple]:
+        if not os.path.exists(self.path):
+            return []
+        if os.path.getsize(self.path) < self._offset:
+            # 파일이 새로 만들어졌으면(날짜 교체 등) 처음부터 읽습니다.
+            self._offset = 0
+
+        ticks = []
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    tick = json.loads(line)
+                    ticks.append((tick['ticker'], tick['price'], tick['volume'], tick.get('time')))
+                except (ValueError, KeyError) as e:
+                    print(f"Warning: Skipping malformed intraday tick in {self.path}: {e}")
+        return ticks
+
+
+def create_price_feed(spec: str = INTRADAY_FEED) -> PriceFeed:
+    """INTRADAY_FEED 설정값으로 시세 입력을 만듭니다."""
+    if spec.startswith('file:'):
+        return FilePriceFeed(spec[len('file:'):])
+    if spec == 'queue':
+        return QueuePriceFeed()
+    raise ValueError(f"지원하지 않는 INTRADAY_FEED 값입니다: {spec}")
+
+
+class IntradayMonitor:
+    """감시 종목의 장중 눌림목 상태를 체결 시세로 갱신합니다.
+
+    종목마다 전 영업일까지의 마감 봉 지표 상태를 한 번 준비해 두고(IntradayPreview),
+    이후에는 시세 입력에서 받은 현재가·누적 거래량으로 당일 봉만 바꿔 O(1)로 다시 판정합니다.
+    날짜가 바뀌면 감시 종목의 마감 봉 상태를 다시 준비합니다.
+    """
+
+    def __init__(self, feed: PriceFeed, poll_seconds: float = INTRADAY_POLL_SECONDS):
+        self.feed = feed
+        self.poll_seconds = poll_seconds
+        self.date = None
+        self._previews: dict[str, IntradayPreview | None] = {}
+        self._latest: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _trading_date(self) -> str:
+        today = datetime.today().date()
+        if not trading_calendar.is_business_day(today):
+            raise ValueError(f"{today.strftime('%Y%m%d')}는 영업일이 아니어서 장중 감시를 할 수 없습니다.")
+        return today.strftime('%Y%m%d')
+
+    def _prepare(self, tickers: list[str], date_str: str) -> dict[str, IntradayPreview | None]:
+        base_date_str = to_yyyymmdd(trading_calendar.previous_business_days(1, datetime.strptime(date_str, '%Y%m%d').date()))[0]
+        states = advance_states(tickers, base_date_str)
+        previews = {}
+        for ticker in tickers:
+            state = states[ticker]
+            if state is None:
+                try:
+                    state = build_state(ticker, base_date_str)
+                except Exception as e:
+                    print(f"Warning: Could not prepare intraday state for {ticker}: {e}")
+            previews[ticker] = state.preview(date_str) if state is not None and state.last_date < date_str else None
+        return previews
+
+    def watch(self, tickers: list[str]) -> dict:
+        """종목들을 감시 대상에 추가하고 마감 봉 상태를 준비합니다."""
+        date_str = self._trading_date()
+        self._roll_over()
+        with self._lock:
+            new_tickers = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._previews]
+            if len(self._previews) + len(new_tickers) > MAX_WATCHED_TICKERS:
+                raise ValueError(f"감시 종목은 최대 {MAX_WATCHED_TICKERS}개까지 등록할 수 있습니다.")
+
+        previews = self._prepare(new_tickers, date_str)
+        with self._lock:
+            self._previews.update(previews)
+            self.date = date_str
+            watched = len(self._previews)
+        self.start()
+
+        unavailable = [ticker for ticker, preview in previews.items() if preview is None]
+        return {"기준일": date_str, "감시종목수": watched, "추가종목": new_tickers, "시세없음": unavailable}
+
+    def unwatch(self, tickers: list[str]) -> int:
+        """종목들을 감시 대상에서 빼고 남은 감시 종목 수를 반환합니다."""
+        with self._lock:
+            for ticker in tickers:
+                self._previews.pop(ticker, None)
+                self._latest.pop(ticker, None)
+            return len(self._previews)
+
+    def process(self, ticks: list[tuple]) -> int:
+        """체결 시세를 반영하고 판정을 갱신한 종목 수를 반환합니다 (감시하지 않는 종목은 무시)."""
+        updated = 0
+        with self._lock:
+            for ticker, price, volume, timestamp in ticks:
+                preview = self._previews.get(ticker)
+                if preview is None:
+                    continue
+                result = preview.evaluate(price, volume)
+                result["현재가"] = price
+                result["누적거래량"] = volume
+                result["갱신시각"] = timestamp
+                self._latest[ticker] = result
+                updated += 1
+        return updated
+
+    def _roll_over(self):
+        """날짜가 바뀌었으면 감시 종목의 마감 봉 상태를 새 기준일로 다시 준비합니다."""
+        try:
+            date_str = self._trading_date()
+        except ValueError:
+            return
+        if self.date is not None and date_str != self.date:
+            with self._lock:
+                tickers = list(self._previews)
+            print(f"Intraday monitor rolling over to {date_str} ({len(tickers)} tickers).")
+            previews = self._prepare(tickers, date_str)
+            with self._lock:
+                self._previews, self._latest, self.date = previews, {}, date_str
+
+    def _run(self):
+        while True:
+            try:
+                self._roll_over()
+                self.process(self.feed.poll())
+            except Exception as e:
+                print(f"Warning: Intraday monitor update failed: {e}")
+            time.sleep(self.poll_seconds)
+
+    def start(self):
+        """시세 입력을 주기적으로 읽는 백그라운드 스레드를 시작합니다 (이미 실행 중이면 무시)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="intraday-monitor", daemon=True)
+                self._thread.start()
+
+    def get(self, ticker: str) -> dict | None:
+        """감시 중인 종목의 가장 최근 장중 판정 결과를 반환합니다. 아직 체결 시세가 없거나 장이 마감됐으면 None입니다."""
+        with self._lock:
+            result = self._latest.get(ticker)
+            date_str = self.date
+        if result is None or is_closed_date(date_str):
+            return None
+        return {**result, "details": dict(result["details"])} if "details" in result else dict(result)
+
+    def status(self, tickers: list[str] | None = None) -> dict:
+        """감시 종목(또는 지정 종목)의 장중 판정 결과를 반환합니다."""
+        with self._lock:
+            watched = list(self._previews) if tickers is None else [ticker for ticker in tickers if ticker in self._previews]
+            results = []
+            for ticker in watched:
+                result = self._latest.get(ticker)
+                if result is None:
+                    preview = self._previews[ticker]
+                    reason = "시세 데이터가 없습니다." if preview is None else "아직 체결 시세가 없습니다."
+                    result = {"is_pullback": False, "reason": reason}
+                results.append({"ticker": ticker, **result})
+            return {"기준일": self.date, "감시종목수": len(self._previews), "results": results}
+
+
+intraday_monitor = IntradayMonitor(create_price_feed())
@@ -0,0 +1,261 @@
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from fastapi.routing import APIRoute
+
+# 지연 시간 히스토그램 구간 상한(초)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 요청 프로파일 샘플링 간격(초)
+PROFILE_INTERVAL_SECONDS = float(os.getenv('PROFILE_INTERVAL_SECONDS', '0.005'))
+# 메모리에 보관하는 최근 프로파일 수
+PROFILE_HISTORY_SIZE = 20
+# 샘플에서 제외하는 대기 상태의 함수 (유휴 워커 스레드, 이벤트 루프 대기)
+_IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('selectors.py', 'select'),
+    ('thread.py', '_worker'),
+}
+
+
+class Histogram:
+    """Prometheus 형식으로 내보낼 수 있는 누적 구간 히스토그램 (레이블 조합별)."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [구간별 개수..., +Inf 개수, 합계]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            base = _labels(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(list(zip(self.label_names, labels)) + [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{base} {series[-1]}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+request_latency = Histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간', ('method', 'route', 'status')
+)
+stage_latency = Histogram(
+    'stage_duration_seconds', '요청 내부 단계별 처리 시간', ('stage',)
+)
+
+
+@contextmanager
+def span(stage: str):
+    """with 블록(또는 데코레이터로 감싼 함수)의 실행 시간을 단계별 히스토그램에 기록합니다."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - started_at, stage)
+
+
+def _gauge(name: str, help_text: str, metric_type: str, samples: list[tuple[dict, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.items())} {value}")
+    return lines
+
+
+def render_metrics(cache_stats: dict[str, dict], fetch_stats: dict) -> str:
+    """요청·단계별 지연 시간, 캐시 적중률, 외부 호출 통계를 Prometheus 텍스트 형식으로 만듭니다."""
+    lines = request_latency.render() + stage_latency.render()
+
+    lines += _gauge('cache_hits_total', '캐시 적중 횟수', 'counter',
+                    [({'cache': name}, stats['hits']) for name, stats in cache_stats.items()])
+    lines += _gauge('cache_misses_total', '캐시 실패 횟수', 'counter',
+                    [({'cache': name}, stats['misses']) for name, stats in cache_stats.items()])
+    lines += _gauge('cache_entries', '캐시 항목 수', 'gauge',
+                    [({'cache': name}, stats['size']) for name, stats in cache_stats.items()])
+
+    calls = fetch_stats['calls']
+    for key, help_text in (('calls', '외부 시세 호출 횟수'), ('errors', '외부 시세 호출 실패 횟수'),
+                           ('retries', '외부 시세 호출 재시도 횟수'), ('coalesced', '진행 중 호출에 병합된 요청 수')):
+        lines += _gauge(f'krx_{key}_total', help_text, 'counter',
+                        [({'function': name}, stats[key]) for name, stats in calls.items()])
+    lines += _gauge('krx_inflight', '진행 중인 외부 시세 호출 수', 'gauge', [({}, fetch_stats['inflight'])])
+    return '\n'.join(lines) + '\n'
+
+
+# 현재 요청을 프로파일링 중인 프로파일러 (스레드 풀로 넘어간 엔드포인트에도 전달됩니다)
+_active_profiler: ContextVar['SamplingProfiler | None'] = ContextVar('active_profiler', default=None)
+
+
+class SamplingProfiler:
+    """백그라운드 스레드에서 일정 간격으로 요청을 처리하는 스레드의 호출 스택을 수집하는 샘플링 프로파일러.
+
+    엔드포인트를 실행하는 동안 등록된 스레드(동기 엔드포인트는 스레드 풀 워커, 비동기 엔드포인트는 이벤트 루프)만 보므로
+    동시에 처리 중인 다른 요청의 스택은 섞이지 않습니다. 대기 중인 스택은 제외하고 스택별 샘플 수를 집계합니다 (collapsed stack 형식).
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads = Counter()
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def activate(self):
+        """with 블록 안에서 시작되는 엔드포인트 실행을 이 프로파일러의 샘플링 대상으로 삼습니다."""
+        token = _active_profiler.set(self)
+        try:
+            yield
+        finally:
+            _active_profiler.reset(token)
+
+    @contextmanager
+    def attach_current_thread(self):
+        """with 블록을 실행하는 동안 현재 스레드를 샘플링합니다."""
+        thread_id = threading.get_ident()
+        with self._threads_lock:
+            self._threads[thread_id] += 1
+        try:
+            yield
+        finally:
+            with self._threads_lock:
+                self._threads[thread_id] -= 1
+                if self._threads[thread_id] <= 0:
+                    del self._threads[thread_id]
+
+    def _sample(self):
+        with self._threads_lock:
+            thread_ids = list(self._threads)
+        frames = sys._current_frames()
+        for thread_id in thread_ids:
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _profiled_endpoint(endpoint):
+    """프로파일링 중인 요청이면 엔드포인트를 실행하는 스레드를 샘플링 대상으로 등록하도록 감쌉니다."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return await endpoint(*args, **kwargs)
+            with profiler.attach_current_thread():
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return endpoint(*args, **kwargs)
+            with profiler.attach_current_thread():
+                return endpoint(*args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """X-Profile 요청에서 엔드포인트를 실행하는 스레드만 샘플링하도록 엔드포인트를 감싸는 라우트 클래스."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+
+_profile_ids = itertools.count(1)
+_profiles = deque(maxlen=PROFILE_HISTORY_SIZE)
+_profiles_lock = threading.Lock()
+
+
+def save_profile(method: str, path: str, duration: float, profiler: SamplingProfiler) -> int:
+    """요청 프로파일을 최근 프로파일 목록에 보관하고 ID를 반환합니다."""
+    profile = {
+        "id": next(_profile_ids),
+        "method": method,
+        "path": path,
+        "시각": datetime.now().isoformat(timespec='seconds'),
+        "처리시간(ms)": round(duration * 1000, 1),
+        "샘플수": profiler.samples,
+        "샘플간격(ms)": profiler.interval * 1000,
+        "stacks": dict(profiler.stacks.most_common())
+    }
+    with _profiles_lock:
+        _profiles.append(profile)
+    return profile["id"]
+
+
+def list_profiles() -> list[dict]:
+    """보관 중인 프로파일의 요약 목록을 최근 순으로 반환합니다."""
+    with _profiles_lock:
+        return [{key: value for key, value in profile.items() if key != "stacks"} for profile in reversed(_profiles)]
+
+
+def get_profile(profile_id: int) -> dict | None:
+    """ID에 해당하는 프로파일을 반환합니다. 없으면 None을 반환합니다."""
+    with _profiles_lock:
+        return next((profile for profile in _profiles if profile["id"] == profile_id), None)
@@ -0,0 +1,215 @@
+import os
+import tempfile
+from datetime import datetime, time
+from functools import lru_cache
+
+import pandas as pd
+
+from services.cache_service import MISSING, TTLCache
+from services.stock_service import get_market_ohlcv_all, get_market_ohlcv_all_many
+
+# 날짜별 전 종목 시세를 Parquet 파티션(YYYYMMDD.parquet)으로 보관하는 로컬 저장소
+OHLCV_STORE_DIR = os.getenv(
+    'OHLCV_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ohlcv')
+)
+# 장 마감 이후에만 당일 파티션을 확정 저장합니다.
+MARKET_CLOSE_TIME = time(15, 30)
+# 메모리에 유지할 파티션 수 (약 1년치 영업일)
+PARTITION_CACHE_SIZE = 300
+# 장 마감 전 시세는 파티션으로 저장하지 않으므로, 잦은 조회가 매번 KRX를 호출하지 않도록 이 시간(초)만큼만 메모리에 둡니다.
+INTRADAY_TABLE_TTL_SECONDS = 60
+
+# 휴장일 판정에 쓰는 가격 컬럼 (pykrx는 휴장일에 이 값이 모두 0인 테이블을 돌려줍니다)
+OHLC_COLUMNS = ('시가', '고가', '저가', '종가')
+
+intraday_table_cache = TTLCache('intraday_market_table', maxsize=4)
+
+
+def _partition_path(date: str) -> str:
+    return os.path.join(OHLCV_STORE_DIR, f"{date}.parquet")
+
+
+def _closed_marker_path(date: str) -> str:
+    return os.path.join(OHLCV_STORE_DIR, f"{date}.closed")
+
+
+def is_market_closed_table(df: pd.DataFrame) -> bool:
+    """영업일 달력에는 없지만 실제로 장이 열리지 않은 날(연말 휴장일 등)의 pykrx 응답인지 확인합니다.
+
+    빈 테이블이거나 모든 종목의 시가·고가·저가·종가가 0이면 휴장일로 봅니다.
+    """
+    if df.empty:
+        return True
+    columns = [column for column in OHLC_COLUMNS if column in df.columns]
+    return bool(columns) and bool((df[columns].to_numpy() == 0).all())
+
+
+def is_closed_date(date: str) -> bool:
+    """해당 날짜의 시세가 더 이상 바뀌지 않는(장이 마감된) 날짜인지 확인합니다."""
+    now = datetime.now()
+    today_str = now.strftime('%Y%m%d')
+    if date < today_str:
+        return True
+    return date == today_str and now.time() >= MARKET_CLOSE_TIME
+
+
+def has_partition(date: str) -> bool:
+    """지정된 날짜의 파티션(또는 휴장일 표시)이 로컬 저장소에 있는지 확인합니다."""
+    return os.path.exists(_partition_path(date)) or os.path.exists(_closed_marker_path(date))
+
+
+def mark_closed_day(date: str):
+    """장이 열리지 않은 날짜를 빈 표시 파일로 기록해 다시 조회하지 않도록 합니다."""
+    os.makedirs(OHLCV_STORE_DIR, exist_ok=True)
+    with open(_closed_marker_path(date), 'w', encoding='utf-8'):
+        pass
+    _read_partition_cached.cache_clear()
+
+
+def list_partitions() -> list[str]:
+    """로컬 저장소에 있는 파티션 날짜 목록을 오름차순으로 반환합니다."""
+    if not os.path.isdir(OHLCV_STORE_DIR):
+        return []
+    return sorted(name[:-len('.parquet')] for name in os.listdir(OHLCV_STORE_DIR) if name.endswith('.parquet'))
+
+
+def write_partition(date: str, df: pd.DataFrame):
+    """지정된 날짜의 전 종목 시세를 파티션 파일로 저장합니다 (임시 파일 작성 후 교체)."""
+    os.makedirs(OHLCV_STORE_DIR, exist_ok=True)
+    path = _partition_path(date)
+    # 같은 날짜를 동시에 채우는 요청끼리 임시 파일이 겹치지 않도록 저장마다 고유한 임시 파일을 씁니다.
+    fd, tmp_path = tempfile.mkstemp(dir=OHLCV_STORE_DIR, prefix=f".{date}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _read_partition_cached.cache_clear()
+
+
+@lru_cache(maxsize=PARTITION_CACHE_SIZE)
+def _read_partition_cached(date: str) -> pd.DataFrame:
+    if os.path.exists(_closed_marker_path(date)):
+        return pd.DataFrame()
+    df = pd.read_parquet(_partition_path(date))
+    # 휴장일 표시 도입 전에 가격이 모두 0인 테이블로 저장된 파티션도 휴장일로 취급합니다.
+    return pd.DataFrame() if is_market_closed_table(df) else df
+
+
+def read_partition(date: str) -> pd.DataFrame | None:
+    """로컬 저장소에서 지정된 날짜의 파티션을 읽습니다. 없으면 None, 휴장일이면 빈 DataFrame을 반환합니다."""
+    if not has_partition(date):
+        return None
+    return _read_partition_cached(date)
+
+
+def _read_stored(date: str) -> pd.DataFrame | None:
+    """파티션(휴장일이면 빈 테이블) 또는 최근에 받은 장중 시세를 반환합니다. 둘 다 없으면 None을 반환합니다."""
+    df = read_partition(date)
+    if df is not None:
+        return df
+    # 장이 마감되면 캐시된 장중 시세 대신 확정 시세를 다시 받아 파티션으로 저장합니다.
+    df = intraday_table_cache.get(_intraday_key(date))
+    return None if df is MISSING else df
+
+
+def _intraday_key(date: str):
+    # 장 마감 전 시세와 마감 후 아직 게시되지 않은 빈 응답을 다른 키로 캐시해, 마감 후에는 장중 시세를 쓰지 않습니다.
+    return (date, 'closed') if is_closed_date(date) else date
+
+
+def _store_fetched(date: str, df: pd.DataFrame, persist: bool) -> pd.DataFrame:
+    """받아 온 시세를 저장하고 호출자에게 돌려줄 테이블을 반환합니다 (휴장일이면 빈 DataFrame)."""
+    # 당일 장 마감 직후의 빈 응답은 아직 시세가 게시되지 않은 것일 수 있으므로 휴장일로 기록하지 않습니다.
+    published = not df.empty or date < datetime.now().strftime('%Y%m%d')
+    if is_market_closed_table(df):
+        df = pd.DataFrame()
+
+    if not is_closed_date(date) or not published:
+        intraday_table_cache.set(_intraday_key(date), df, ttl=INTRADAY_TABLE_TTL_SECONDS)
+    elif persist and df.empty:
+        mark_closed_day(date)
+        print(f"OHLCV store marked {date} as a market holiday.")
+    elif persist:
+        write_partition(date, df)
+        print(f"OHLCV partition for {date} stored ({len(df)} tickers).")
+    return df
+
+
+def get_market_table(date: str, persist: bool = True) -> pd.DataFrame:
+    """지정된 날짜의 전 종목 시세를 로컬 저장소에서 읽고, 없으면 pykrx에서 받아 파티션으로 추가합니다.
+
+    장 마감 전 날짜의 시세는 저장하지 않고 INTRADAY_TABLE_TTL_SECONDS 동안만 메모리에 캐시합니다.
+    """
+    df = _read_stored(date)
+    if df is not None:
+        return df
+
+    return _store_fetched(date, get_market_ohlcv_all(date), persist)
+
+
+def get_market_tables(dates: list[str], persist: bool = True) -> dict[str, pd.DataFrame]:
+    """여러 날짜의 전 종목 시세를 반환합니다. 로컬에 없는 날짜는 pykrx에서 동시에 받아 파티션으로 추가합니다."""
+    tables = {}
+    missing = []
+    for date in dates:
+        df = _read_stored(date)
+        if df is None:
+            missing.append(date)
+        else:
+            tables[date] = df
+
+    for date, df in get_market_ohlcv_all_many(missing).items():
+        tables[date] = _store_fetched(date, df, persist)
+    return {date: tables[date] for date in dates}
+
+
+def sync_partitions(dates: list[str]) -> list[str]:
+    """누락된 날짜의 파티션을 채우고, 새로 추가된 날짜 목록을 반환합니다."""
+    missing = [date for date in dates if not has_partition(date) and is_closed_date(date)]
+    tables = get_market_tables(missing)
+    return [date for date, df in tables.items() if not df.empty]
+
+
+def load_price_matrix(dates: list[str], fields: tuple[str, ...] = ('종가', '거래량')) -> dict[str, pd.DataFrame]:
+    """날짜별 전 종목 시세를 모아 필드마다 날짜×티커 행렬(DataFrame)로 반환합니다.
+
+    해당 날짜에 거래되지 않은 종목의 값은 NaN으로 채워지고, 휴장일은 행에서 빠집니다.
+    """
+    daily = {date: df for date, df in get_market_tables(dates).items() if not df.empty}
+
+    matrices = {}
+    for field in fields:
+        if not daily:
+            matrices[field] = pd.DataFrame()
+            continue
+        matrix = pd.concat({date: df[field] for date, df in daily.items()}, axis=1).T
+        matrix.index = pd.to_datetime(matrix.index, format='%Y%m%d')
+        matrices[field] = matrix.sort_index().astype(float)
+    return matrices
+
+
+def load_ticker_history(ticker: str, dates: list[str]) -> pd.DataFrame | None:
+    """로컬 저장소만으로 단일 종목의 일별 시세를 구성합니다.
+
+    요청 구간의 파티션이 하나라도 없으면 None을 반환하여 호출자가 원격 조회로 대체할 수 있게 합니다.
+    휴장일로 기록된 날짜는 건너뜁니다.
+    """
+    rows = {}
+    for date in dates:
+        df = read_partition(date)
+        if df is None:
+            return None
+        if ticker in df.index:
+            rows[date] = df.loc[[ticker]].drop(columns=['시장'], errors='ignore')
+
+    if not rows:
+        return pd.DataFrame()
+    history = pd.concat(rows.values())
+    history.index = pd.to_datetime(list(rows.keys()), format='%Y%m%d')
+    history.index.name = '날짜'
+    return history
@@ -0,0 +1,144 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from multiprocessing import shared_memory
+from typing import Callable, Iterator
+
+import numpy as np
+
+# 분석용 프로세스 수 (0이면 프로세스 풀을 쓰지 않고 현재 프로세스에서 계산)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '0'))
+# 종목 수가 이보다 적으면 프로세스 간 전달 비용이 더 커서 현재 프로세스에서 계산합니다.
+PARALLEL_MIN_TICKERS = int(os.getenv('ANALYSIS_PARALLEL_MIN_TICKERS', '400'))
+# 작업자마다 나눠 줄 종목 묶음 수 (묶음별 계산 시간 편차를 흡수)
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 부모 프로세스의 스레드(시세 조회 워커 등)를 물려받지 않도록 spawn으로 작업자를 만듭니다.
+            _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def shutdown_pool():
+    """프로세스 풀이 만들어져 있으면 작업자를 종료합니다 (앱 종료 시)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def parallel_enabled(n_tickers: int) -> bool:
+    """종목 수가 n_tickers인 계산을 프로세스 풀에서 실행할지 여부."""
+    return ANALYSIS_WORKERS > 1 and n_tickers >= PARALLEL_MIN_TICKERS
+
+
+def _create_shared(stack: ExitStack, shape: tuple, dtype) -> shared_memory.SharedMemory:
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    stack.callback(shm.unlink)
+    stack.callback(shm.close)
+    return shm
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # spawn으로 만든 작업자는 부모의 resource tracker를 같이 쓰므로 등록은 부모의 unlink 때 함께 정리됩니다.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _view(shm: shared_memory.SharedMemory, shape: tuple, dtype) -> np.ndarray:
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_chunk(fn: Callable, shared_args: tuple, input_specs: list[tuple], output_specs: dict[str, tuple],
+               start: int, stop: int):
+    """작업자 프로세스: 공유 메모리의 입력 열 [start, stop)을 복사 없이 읽어 계산하고 결과를 출력 공유 메모리에 씁니다."""
+    input_shms = [_attach(name) for name, _, _ in input_specs]
+    output_shms = {key: _attach(name) for key, (name, _, _) in output_specs.items()}
+    inputs = result = None
+    try:
+        inputs = [_view(shm, shape, dtype)[:, start:stop] for shm, (_, shape, dtype) in zip(input_shms, input_specs)]
+        result = fn(*shared_args, *inputs)
+        for key, (_, shape, dtype) in output_specs.items():
+            _view(output_shms[key], shape, dtype)[:, start:stop] = result[key]
+    finally:
+        # 배열 뷰가 남아 있으면 공유 메모리를 닫을 수 없으므로 먼저 참조를 끊습니다.
+        inputs = result = None
+        for shm in input_shms + list(output_shms.values()):
+            shm.close()
+
+
+def _chunk_bounds(n_columns: int, chunk_size: int) -> list[tuple[int, int]]:
+    return [(start, min(start + chunk_size, n_columns)) for start in range(0, n_columns, chunk_size)]
+
+
+def map_column_chunks(fn: Callable[..., dict[str, np.ndarray]], arrays: list[np.ndarray], shared_args: tuple = (),
+                      chunk_size: int | None = None) -> Iterator[tuple[int, int, dict[str, np.ndarray]]]:
+    """T×N 행렬들을 종목(열) 묶음으로 나눠 fn(*shared_args, *열 묶음)을 계산하고 (시작 열, 끝 열, 결과)를 열 순서대로 내보냅니다.
+
+    fn은 열끼리 독립인 계산이어야 하며 입력과 같은 행 수의 T×(묶음 열 수) 배열 dict를 반환해야 합니다.
+    chunk_size를 생략하면 현재 프로세스에서는 한 번에, 프로세스 풀에서는 작업자 수에 맞춰 나눠 계산합니다.
+    프로세스 풀을 쓸 때는 입력 행렬을 공유 메모리에 한 번만 올리고, 작업자는 이를 복사 없이 읽어
+    결과를 출력 공유 메모리의 자기 열에 직접 씁니다.
+    """
+    n_rows, n_columns = arrays[0].shape
+    if not parallel_enabled(n_columns):
+        for start, stop in _chunk_bounds(n_columns, chunk_size or n_columns or 1):
+            yield start, stop, fn(*shared_args, *[array[:, start:stop] for array in arrays])
+        return
+
+    balanced_size = math.ceil(n_columns / (ANALYSIS_WORKERS * CHUNKS_PER_WORKER))
+    chunk_size = balanced_size if chunk_size is None else min(chunk_size, balanced_size)
+    pool = _get_pool()
+
+    with ExitStack() as stack:
+        input_specs = []
+        for array in arrays:
+            shm = _create_shared(stack, array.shape, array.dtype)
+            _view(shm, array.shape, array.dtype)[:] = array
+            input_specs.append((shm.name, array.shape, array.dtype.str))
+
+        # 출력 배열의 종류와 자료형은 첫 종목 하나로 계산해 정합니다.
+        probe = fn(*shared_args, *[array[:, :1] for array in arrays])
+        output_shms = {key: _create_shared(stack, (n_rows, n_columns), value.dtype) for key, value in probe.items()}
+        output_specs = {
+            key: (output_shms[key].name, (n_rows, n_columns), value.dtype.str) for key, value in probe.items()
+        }
+
+        futures = [
+            (start, stop, pool.submit(_run_chunk, fn, shared_args, input_specs, output_specs, start, stop))
+            for start, stop in _chunk_bounds(n_columns, chunk_size)
+        ]
+        try:
+            for start, stop, future in futures:
+                future.result()
+                # 공유 메모리는 이 블록을 벗어나면 해제되므로 호출자에게는 사본을 넘깁니다.
+                yield start, stop, {
+                    key: _view(output_shms[key], shape, dtype)[:, start:stop].copy()
+                    for key, (_, shape, dtype) in output_specs.items()
+                }
+        finally:
+            for _, _, future in futures:
+                future.cancel()
+            # 아직 실행 중인 묶음이 공유 메모리를 쓰는 동안 해제하지 않도록 기다립니다.
+            for _, _, future in futures:
+                if not future.cancelled():
+                    future.exception()
+
+
+def compute_columns(fn: Callable[..., dict[str, np.ndarray]], arrays: list[np.ndarray], shared_args: tuple = ()) -> dict[str, np.ndarray]:
+    """map_column_chunks의 묶음별 결과를 열 방향으로 이어 붙여 전체 결과를 반환합니다."""
+    chunks = [result for _, _, result in map_column_chunks(fn, arrays, shared_args)]
+    if len(chunks) == 1:
+        return chunks[0]
+    return {key: np.concatenate([chunk[key] for chunk in chunks], axis=1) for key in chunks[0]}
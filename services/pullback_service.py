@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import numpy as np
+
+from services.ohlcv_store import load_price_matrix
+from services.parallel_service import map_column_chunks
+from services.stock_service import get_business_days_between
+
+# check_pullback과 동일한 판정 기준
+LOOKBACK_CALENDAR_DAYS = 100
+MIN_BARS = 60
+HIGH_WINDOW = 45
+HIGH_MA20_RATIO = 1.05
+HIGH_MIN_DAYS = 3
+HIGH_MAX_DAYS = 30
+RISE_VOLUME_WINDOW = 10
+NEAR_MA20_LOWER = 0.98
+NEAR_MA20_UPPER = 1.03
+VOLUME_DECLINE_RATIO = 0.8
+MIN_SATISFIED = 4
+CONDITION_COUNT = 5
+# 전 종목 스캔 시 한 번에 신호를 계산하는 종목 수
+SCAN_CHUNK_SIZE = 200
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """날짜×종목 행렬의 열 방향 이동평균을 누적합으로 계산합니다.
+
+    pandas의 rolling(window).mean()과 같이 창이 다 차지 않았거나 NaN이 섞인 구간은 NaN입니다.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return out
+
+    zeros = np.zeros((1,) + values.shape[1:])
+    nan_mask = np.isnan(values)
+    csum = np.concatenate([zeros, np.cumsum(np.where(nan_mask, 0.0, values), axis=0)])
+    ncount = np.concatenate([zeros, np.cumsum(nan_mask, axis=0)])
+
+    sums = csum[window:] - csum[:-window]
+    nans = ncount[window:] - ncount[:-window]
+    out[window - 1:] = np.where(nans == 0, sums / window, np.nan)
+    return out
+
+
+def compute_pullback_signals(dates: np.ndarray, close: np.ndarray, volume: np.ndarray) -> dict[str, np.ndarray]:
+    """모든 날짜·종목에 대해 눌림목 5개 조건을 한 번에 계산합니다.
+
+    dates는 datetime64[D] 배열(길이 T), close와 volume은 T×N 행렬입니다.
+    반환되는 각 배열의 t행은 t일을 기준일로 check_pullback을 실행한 결과와 같은 의미를 갖습니다.
+    """
+    n_rows = close.shape[0]
+    rows = np.arange(n_rows)[:, None]
+
+    ma5 = rolling_mean(close, 5)
+    ma20 = rolling_mean(close, 20)
+    ma60 = rolling_mean(close, 60)
+    avg_vol_3 = rolling_mean(volume, 3)
+    avg_vol_10 = rolling_mean(volume, RISE_VOLUME_WINDOW)
+
+    with np.errstate(invalid='ignore'):
+        cond_aligned = (ma5 > ma20) & (ma20 > ma60)
+
+        # 최근 3개 ma20의 1차 회귀 기울기는 (ma20[t] - ma20[t-2]) / 2 와 같습니다.
+        ma20_slope = np.full(close.shape, np.nan)
+        ma20_slope[2:] = (ma20[2:] - ma20[:-2]) / 2
+        cond_rising = ma20_slope > 0
+
+        # 기준일 직전 45거래일 중 종가가 ma20의 1.05배를 넘은 마지막 날을 찾습니다.
+        high_mask = close > ma20 * HIGH_MA20_RATIO
+        last_high = np.maximum.accumulate(np.where(high_mask, rows, -1), axis=0)
+        high_loc = np.full(close.shape, -1)
+        high_loc[1:] = last_high[:-1]
+        has_high = (high_loc >= 0) & (high_loc >= rows - HIGH_WINDOW)
+
+        safe_loc = np.where(has_high, high_loc, 0)
+        days_since_high = (dates[:, None] - dates[safe_loc]).astype('timedelta64[D]').astype(int)
+        cond_recent_high = has_high & (days_since_high >= HIGH_MIN_DAYS) & (days_since_high <= HIGH_MAX_DAYS)
+
+        # 고점 직전 10거래일 평균 거래량 (고점 이전 데이터가 10일 미만이면 0)
+        rise_loc = np.where(cond_recent_high & (high_loc >= RISE_VOLUME_WINDOW), high_loc - 1, 0)
+        avg_vol_rise = np.take_along_axis(avg_vol_10, rise_loc, axis=0)
+        avg_vol_rise = np.where(cond_recent_high & (high_loc >= RISE_VOLUME_WINDOW), avg_vol_rise, 0.0)
+        avg_vol_rise = np.nan_to_num(avg_vol_rise, nan=0.0)
+
+        cond_near_ma20 = (close >= ma20 * NEAR_MA20_LOWER) & (close <= ma20 * NEAR_MA20_UPPER)
+
+        cond_volume_decreased = (
+            cond_recent_high
+            & (avg_vol_rise > 0)
+            & ~np.isnan(avg_vol_3)
+            & (avg_vol_3 < avg_vol_rise * VOLUME_DECLINE_RATIO)
+        )
+
+    satisfied = (
+        cond_aligned.astype(int)
+        + cond_rising.astype(int)
+        + cond_recent_high.astype(int)
+        + cond_near_ma20.astype(int)
+        + cond_volume_decreased.astype(int)
+    )
+
+    return {
+        "close": close,
+        "ma5": ma5,
+        "ma20": ma20,
+        "ma60": ma60,
+        "avg_vol_3": avg_vol_3,
+        "avg_vol_rise": avg_vol_rise,
+        "cond_aligned": cond_aligned,
+        "cond_rising": cond_rising,
+        "cond_recent_high": cond_recent_high,
+        "cond_near_ma20": cond_near_ma20,
+        "cond_volume_decreased": cond_volume_decreased,
+        "satisfied": satisfied,
+        "score": np.round(satisfied / CONDITION_COUNT, 2),
+        "is_pullback": satisfied >= MIN_SATISFIED,
+        "sufficient": ~np.isnan(ma60),
+    }
+
+
+def to_native(value):
+    """numpy 스칼라를 JSON 직렬화 가능한 파이썬 값으로 변환합니다 (NaN은 None)."""
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def format_signal(signals: dict[str, np.ndarray], row: int, col: int, date_str: str) -> dict:
+    """신호 행렬의 한 칸을 check_pullback과 같은 형태의 결과 dict로 변환합니다."""
+    if not signals["sufficient"][row, col]:
+        return {"is_pullback": False, "reason": f"데이터 부족 (최소 {MIN_BARS}일 필요)"}
+
+    satisfied = int(signals["satisfied"][row, col])
+    return {
+        "is_pullback": bool(signals["is_pullback"][row, col]),
+        "score": float(signals["score"][row, col]),
+        "details": {
+            "기준일": date_str,
+            "종가": to_native(signals["close"][row, col]),
+            "ma5": to_native(signals["ma5"][row, col]),
+            "ma20": to_native(signals["ma20"][row, col]),
+            "ma60": to_native(signals["ma60"][row, col]),
+            "최근3일평균거래량": to_native(signals["avg_vol_3"][row, col]),
+            "상승시평균거래량": to_native(signals["avg_vol_rise"][row, col]),
+            "조건1_정배열": bool(signals["cond_aligned"][row, col]),
+            "조건2_ma20상승기울기": bool(signals["cond_rising"][row, col]),
+            "조건3_최근상승이력(고점기준)": bool(signals["cond_recent_high"][row, col]),
+            "조건4_ma20근접": bool(signals["cond_near_ma20"][row, col]),
+            "조건5_거래량감소": bool(signals["cond_volume_decreased"][row, col]),
+            "조건_만족도": f"{satisfied}/{CONDITION_COUNT}"
+        }
+    }
+
+
+def iter_scan_pullback(date_str: str, tickers: list[str] | None = None, chunk_size: int = SCAN_CHUNK_SIZE) -> Iterator[dict]:
+    """기준일의 전 종목(또는 지정 종목) 눌림목 판정 결과를 종목 묶음 단위로 계산하며 하나씩 내보냅니다.
+
+    조건 계산은 종목(열)끼리 독립이므로 chunk_size개 종목씩 나눠 계산해도 결과는 같고,
+    한 번에 메모리에 올라가는 신호 행렬은 한 묶음 분량뿐입니다.
+    ANALYSIS_WORKERS가 설정되어 있으면 묶음들을 프로세스 풀에서 동시에 계산합니다.
+    """
+    start_date = (datetime.strptime(date_str, '%Y%m%d') - timedelta(days=LOOKBACK_CALENDAR_DAYS)).strftime('%Y%m%d')
+    dates = get_business_days_between(start_date, date_str)
+    matrices = load_price_matrix(dates)
+
+    close_df = matrices['종가']
+    volume_df = matrices['거래량']
+    if close_df.empty:
+        return
+
+    if tickers:
+        close_df = close_df.reindex(columns=tickers)
+        volume_df = volume_df.reindex(columns=tickers)
+
+    row_dates = close_df.index.values.astype('datetime64[D]')
+    close = close_df.to_numpy(dtype=float)
+    volume = volume_df.to_numpy(dtype=float)
+    columns = close_df.columns
+    last_row = len(close_df) - 1
+
+    for start, stop, signals in map_column_chunks(compute_pullback_signals, [close, volume], (row_dates,), chunk_size):
+        for col, ticker in enumerate(columns[start:stop]):
+            result = format_signal(signals, last_row, col, date_str)
+            result["ticker"] = ticker
+            yield result
+
+
+def scan_pullback(date_str: str, tickers: list[str] | None = None) -> list[dict]:
+    """기준일의 전 종목(또는 지정 종목) 눌림목 여부를 벡터 연산으로 판정합니다."""
+    return list(iter_scan_pullback(date_str, tickers))
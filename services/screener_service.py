@@ -0,0 +1,321 @@
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from services.cache_service import MISSING, TTLCache
+from services.metrics_service import span
+from services.ohlcv_store import is_closed_date, load_price_matrix
+from services.parallel_service import compute_columns
+from services.pullback_service import LOOKBACK_CALENDAR_DAYS, compute_pullback_signals, to_native
+from services.stock_service import get_business_days_between
+
+# 스크리너에서 쓸 수 있는 필드와 계산 근거 (순위는 1이 가장 큼)
+SCREENER_FIELDS = {
+    "close": "종가",
+    "volume": "거래량",
+    "value": "거래대금",
+    "change": "등락률(%)",
+    "ma5": "5일 이동평균",
+    "ma20": "20일 이동평균",
+    "ma60": "60일 이동평균",
+    "avg_vol_3": "최근 3일 평균 거래량",
+    "avg_vol_rise": "최근 고점 직전 10일 평균 거래량",
+    "satisfied": "만족한 눌림목 조건 수",
+    "score": "눌림목 점수",
+    "value_rank": "거래대금 순위",
+    "volume_rank": "거래량 순위",
+    "change_rank": "등락률 순위",
+    "is_pullback": "눌림목 여부",
+    "cond_aligned": "조건1 정배열",
+    "cond_rising": "조건2 ma20 상승 기울기",
+    "cond_recent_high": "조건3 최근 상승 이력",
+    "cond_near_ma20": "조건4 ma20 근접",
+    "cond_volume_decreased": "조건5 거래량 감소",
+}
+_SIGNAL_FIELDS = ("close", "ma5", "ma20", "ma60", "avg_vol_3", "avg_vol_rise", "satisfied", "score", "is_pullback",
+                  "cond_aligned", "cond_rising", "cond_recent_high", "cond_near_ma20", "cond_volume_decreased")
+_FLAG_FIELDS = ("is_pullback", "cond_aligned", "cond_rising", "cond_recent_high", "cond_near_ma20", "cond_volume_decreased")
+_RANK_FIELDS = {"value_rank": "value", "volume_rank": "volume", "change_rank": "change"}
+# 한 번에 반환하는 최대 종목 수
+MAX_SCREENER_RESULTS = 500
+
+# 날짜별 지표 테이블 (장 마감일은 바뀌지 않으므로 만료 없이 유지)
+indicator_table_cache = TTLCache('screener_indicators', maxsize=8)
+
+
+class IndicatorTable:
+    """기준일의 종목별 지표 열(필드명 → 길이 N 배열)과 필드별 정렬 순서."""
+
+    def __init__(self, date: str, tickers: np.ndarray, columns: dict[str, np.ndarray]):
+        self.date = date
+        self.tickers = tickers
+        self.columns = columns
+        self._orders = {}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def order(self, field: str, descending: bool) -> np.ndarray:
+        """필드 값으로 정렬한 종목 위치 (NaN은 맨 뒤). 필드·방향별로 한 번만 계산합니다."""
+        key = (field, descending)
+        if key not in self._orders:
+            values = self.columns[field].astype(float)
+            self._orders[key] = np.argsort(-values if descending else values, kind='stable')
+        return self._orders[key]
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """내림차순 순위 (같은 값은 같은 순위, NaN은 NaN)."""
+    ranks = np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    ascending = np.sort(values[valid])
+    # 순위 = 자신보다 큰 값의 개수 + 1
+    ranks[valid] = len(ascending) - np.searchsorted(ascending, values[valid], side='right') + 1
+    return ranks
+
+
+def build_indicator_table(date_str: str) -> IndicatorTable | None:
+    """기준일의 전 종목 지표 테이블을 로컬 시세 저장소로 한 번에 계산합니다. 시세가 없으면 None을 반환합니다."""
+    start_date = (datetime.strptime(date_str, '%Y%m%d') - timedelta(days=LOOKBACK_CALENDAR_DAYS)).strftime('%Y%m%d')
+    dates = get_business_days_between(start_date, date_str)
+    matrices = load_price_matrix(dates, fields=('종가', '거래량', '거래대금', '등락률'))
+    close_df = matrices['종가']
+    if close_df.empty:
+        return None
+
+    row_dates = close_df.index.values.astype('datetime64[D]')
+    signals = compute_columns(
+        compute_pullback_signals,
+        [close_df.to_numpy(dtype=float), matrices['거래량'].to_numpy(dtype=float)],
+        (row_dates,)
+    )
+
+    columns = {field: signals[field][-1] for field in _SIGNAL_FIELDS}
+    columns["volume"] = matrices['거래량'].to_numpy(dtype=float)[-1]
+    columns["value"] = matrices['거래대금'].to_numpy(dtype=float)[-1]
+    columns["change"] = matrices['등락률'].to_numpy(dtype=float)[-1]
+    for rank_field, field in _RANK_FIELDS.items():
+        columns[rank_field] = _rank(columns[field])
+    return IndicatorTable(date_str, close_df.columns.to_numpy(), columns)
+
+
+def get_indicator_table(date_str: str) -> IndicatorTable | None:
+    """기준일의 지표 테이블을 캐시에서 읽고, 없으면 계산해 캐시합니다."""
+    table = indicator_table_cache.get(date_str)
+    if table is MISSING:
+        with span("screener.build_table"):
+            table = build_indicator_table(date_str)
+        # 장중에는 시세가 바뀌므로 짧게만 유지합니다.
+        indicator_table_cache.set(date_str, table, ttl=None if is_closed_date(date_str) and table is not None else 60)
+    return table
+
+
+_TOKEN_PATTERN = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|==|!=|<|>|=|%|\(|\)|\*|/|-))")
+_KEYWORDS = {"AND", "OR", "NOT", "WITHIN", "OF"}
+_COMPARATORS = {"<", "<=", ">", ">=", "==", "=", "!="}
+
+
+def _tokenize(query: str) -> list[tuple[str, object]]:
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        match = _TOKEN_PATTERN.match(query, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"해석할 수 없는 문자가 있습니다: '{query[pos:].strip()[:20]}'")
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(("num", float(number)))
+        elif name is not None:
+            tokens.append(("kw", name.upper()) if name.upper() in _KEYWORDS else ("field", name.lower()))
+        else:
+            tokens.append(("op", symbol))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """스크리너 조건식을 조건 트리로 바꾸는 재귀 하강 파서.
+
+    식      := 그리고식 (OR 그리고식)*
+    그리고식 := 항 (AND 항)*
+    항      := NOT 항 | '(' 식 ')' | 값 WITHIN 숫자 '%' OF 값 | 값 (비교연산자 값)+ | 참거짓필드
+    값      := 기본값 (('*' | '/') 기본값)*,  기본값 := 필드 | 숫자 | '-' 숫자
+    """
+
+    def __init__(self, query: str):
+        self.tokens = _tokenize(query)
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise ValueError("조건식이 중간에 끝났습니다.")
+        self.pos += 1
+        return token
+
+    def _expect(self, kind: str, value):
+        token = self._next()
+        if token != (kind, value):
+            raise ValueError(f"'{value}'가 필요한 위치에 '{token[1]}'가 있습니다.")
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("조건식이 비어 있습니다.")
+        node = self._expression()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"조건식을 해석할 수 없습니다: '{self.tokens[self.pos][1]}' 부근")
+        return node
+
+    def _expression(self):
+        nodes = [self._and_expression()]
+        while self._peek() == ("kw", "OR"):
+            self._next()
+            nodes.append(self._and_expression())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def _and_expression(self):
+        nodes = [self._term()]
+        while self._peek() == ("kw", "AND"):
+            self._next()
+            nodes.append(self._term())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def _term(self):
+        token = self._peek()
+        if token == ("kw", "NOT"):
+            self._next()
+            return ("not", self._term())
+        if token == ("op", "("):
+            self._next()
+            node = self._expression()
+            self._expect("op", ")")
+            return node
+
+        left = self._value()
+        token = self._peek()
+        if token == ("kw", "WITHIN"):
+            self._next()
+            kind, percent = self._next()
+            if kind != "num":
+                raise ValueError("WITHIN 뒤에는 비율(%)이 와야 합니다.")
+            self._expect("op", "%")
+            self._expect("kw", "OF")
+            return ("within", left, percent, self._value())
+        if token[0] == "op" and token[1] in _COMPARATORS:
+            operands, operators = [left], []
+            while self._peek()[0] == "op" and self._peek()[1] in _COMPARATORS:
+                operators.append(self._next()[1])
+                operands.append(self._value())
+            return ("compare", operands, operators)
+        if left[0] == "field" and left[1] in _FLAG_FIELDS:
+            return ("flag", left[1])
+        raise ValueError(f"'{_describe(left)}' 뒤에 비교 연산자나 WITHIN이 필요합니다.")
+
+    def _value(self):
+        node = self._atom()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            operator = self._next()[1]
+            node = (operator, node, self._atom())
+        return node
+
+    def _atom(self):
+        kind, value = self._next()
+        if kind == "num":
+            return ("num", value)
+        if kind == "op" and value == "-":
+            kind, value = self._next()
+            if kind != "num":
+                raise ValueError("'-' 뒤에는 숫자가 와야 합니다.")
+            return ("num", -value)
+        if kind == "field":
+            if value not in SCREENER_FIELDS:
+                raise ValueError(f"알 수 없는 필드입니다: '{value}' (사용 가능: {', '.join(SCREENER_FIELDS)})")
+            return ("field", value)
+        raise ValueError(f"필드나 숫자가 필요한 위치에 '{value}'가 있습니다.")
+
+
+def _describe(node) -> str:
+    return str(node[1]) if node[0] in ("field", "num") else node[0]
+
+
+def parse_query(query: str):
+    """스크리너 조건식을 조건 트리로 해석합니다. 문법 오류는 ValueError로 알립니다.
+
+    예: "ma5>ma20>ma60 AND close within 2% of ma20 AND value_rank<=200"
+    """
+    return _Parser(query).parse()
+
+
+def _evaluate_value(node, table: IndicatorTable):
+    kind = node[0]
+    if kind == "num":
+        return node[1]
+    if kind == "field":
+        return table.columns[node[1]].astype(float)
+    left, right = _evaluate_value(node[1], table), _evaluate_value(node[2], table)
+    return left * right if kind == "*" else left / right
+
+
+_COMPARE = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "=": np.equal, "!=": np.not_equal,
+}
+
+
+def evaluate_query(node, table: IndicatorTable) -> np.ndarray:
+    """조건 트리를 지표 테이블의 열 단위 벡터 연산으로 계산해 종목별 일치 여부(길이 N bool 배열)를 반환합니다.
+
+    NaN이 섞인 비교(데이터 부족 종목)는 거짓입니다.
+    """
+    kind = node[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if kind == "and":
+            return np.logical_and.reduce([evaluate_query(child, table) for child in node[1]])
+        if kind == "or":
+            return np.logical_or.reduce([evaluate_query(child, table) for child in node[1]])
+        if kind == "not":
+            return ~evaluate_query(node[1], table)
+        if kind == "flag":
+            return table.columns[node[1]].astype(bool)
+        if kind == "within":
+            left, right = _evaluate_value(node[1], table), _evaluate_value(node[3], table)
+            mask = np.abs(left - right) <= np.abs(right) * node[2] / 100
+        else:
+            values = [_evaluate_value(operand, table) for operand in node[1]]
+            mask = np.ones(len(table), dtype=bool)
+            for operator, left, right in zip(node[2], values, values[1:]):
+                mask &= _COMPARE[operator](left, right)
+    return np.broadcast_to(mask, (len(table),)).copy()
+
+
+def screen(date_str: str, query: str, sort: str = "-score", limit: int = 100) -> dict | None:
+    """기준일 전 종목 중 조건식을 만족하는 종목을 정렬 기준 순으로 limit개 반환합니다. 시세가 없으면 None입니다.
+
+    sort는 필드명이며 앞에 '-'를 붙이면 내림차순입니다.
+    """
+    node = parse_query(query)
+    descending = sort.startswith('-')
+    sort_field = sort.lstrip('-').lower()
+    if sort_field not in SCREENER_FIELDS:
+        raise ValueError(f"알 수 없는 정렬 기준입니다: '{sort_field}'")
+
+    table = get_indicator_table(date_str)
+    if table is None:
+        return None
+
+    with span("screener.evaluate"):
+        mask = evaluate_query(node, table)
+        order = table.order(sort_field, descending)
+        positions = order[mask[order]]
+
+    results = []
+    for position in positions[:limit]:
+        result = {"ticker": table.tickers[position]}
+        result.update({field: to_native(values[position]) for field, values in table.columns.items()})
+        results.append(result)
+    return {"기준일": date_str, "종목수": len(table), "일치종목수": int(mask.sum()), "results": results}
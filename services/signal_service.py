@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from database import db
+from services.cache_service import MISSING, TTLCache
+from services.firestore_service import MAX_BATCH_OPERATIONS
+from services.metrics_service import span
+from services.ohlcv_store import is_closed_date
+from services.pullback_service import scan_pullback
+from services.ticker_service import get_name
+
+# 날짜별 눌림목 신호 문서 (daily_pullback/{날짜}: 요약과 점수순 순위,
+# daily_pullback/{날짜}/signals/{티커}: 종목별 check_pullback 형식 결과)
+SIGNAL_COLLECTION = 'daily_pullback'
+SIGNAL_SUBCOLLECTION = 'signals'
+# 요약 문서에 점수순으로 담아 두는 종목 수
+RANKING_SIZE = 100
+
+# 장 마감일의 신호는 바뀌지 않으므로 다시 계산될 때까지 유지합니다.
+signal_cache = TTLCache('daily_pullback', maxsize=4096)
+ranking_cache = TTLCache('daily_pullback_ranking', maxsize=32)
+
+
+def _ranking_entry(result: dict) -> dict:
+    return {
+        "ticker": result["ticker"],
+        "stock_name": result.get("stock_name"),
+        "score": result.get("score", 0),
+        "is_pullback": result["is_pullback"],
+        "조건_만족도": result.get("details", {}).get("조건_만족도")
+    }
+
+
+def create_daily_signals(date: str) -> dict:
+    """장 마감일의 전 종목 눌림목 신호를 한 번에 계산해 Firestore에 저장하고 요약을 반환합니다.
+
+    종목별 결과는 하위 컬렉션 문서로 WriteBatch 단위로 나눠 쓰고,
+    요약 문서에는 점수 내림차순(같으면 티커순) 상위 RANKING_SIZE개 종목을 담습니다.
+    """
+    if not is_closed_date(date):
+        raise ValueError(f"{date}는 아직 장이 마감되지 않아 신호를 확정할 수 없습니다.")
+
+    with span("signals.compute"):
+        results = scan_pullback(date)
+    if not results:
+        raise ValueError(f"{date} 기준 시세 데이터가 없습니다.")
+    for result in results:
+        result["stock_name"] = get_name(result["ticker"])
+
+    ranked = sorted(results, key=lambda r: (-r.get("score", 0), r["ticker"]))
+    summary = {
+        "기준일": date,
+        "종목수": len(results),
+        "눌림목종목수": sum(1 for r in results if r["is_pullback"]),
+        "ranking": [_ranking_entry(result) for result in ranked[:RANKING_SIZE]],
+        "created_at": datetime.now().isoformat()
+    }
+
+    date_ref = db.collection(SIGNAL_COLLECTION).document(date)
+    signals_ref = date_ref.collection(SIGNAL_SUBCOLLECTION)
+    with span("signals.firestore_write"):
+        for i in range(0, len(results), MAX_BATCH_OPERATIONS):
+            batch = db.batch()
+            for result in results[i:i + MAX_BATCH_OPERATIONS]:
+                batch.set(signals_ref.document(result["ticker"]), result)
+            batch.commit()
+        # 요약 문서는 종목별 문서를 모두 쓴 뒤에 저장하여, 요약이 있으면 종목별 결과도 있도록 합니다.
+        date_ref.set(summary)
+
+    signal_cache.clear()
+    ranking_cache.invalidate(date)
+    print(f"Daily pullback signals for {date} stored ({len(results)} tickers, {summary['눌림목종목수']} pullbacks).")
+    return {key: value for key, value in summary.items() if key != "ranking"}
+
+
+def get_daily_ranking(date: str) -> dict | None:
+    """저장된 날짜별 신호 요약(점수순 순위 포함)을 반환합니다. 없으면 None을 반환합니다."""
+    cached = ranking_cache.get(date)
+    if cached is not MISSING:
+        return cached
+
+    doc = db.collection(SIGNAL_COLLECTION).document(date).get()
+    summary = doc.to_dict() if doc.exists else None
+    # 아직 계산되지 않은 날짜는 곧 생성될 수 있으므로 짧게만 캐시합니다.
+    ranking_cache.set(date, summary, ttl=None if summary is not None else 60)
+    return summary
+
+
+def get_daily_signal(date: str, ticker: str) -> dict | None:
+    """저장된 종목별 신호를 문서 하나만 읽어 반환합니다. 해당 날짜의 신호가 없으면 None을 반환합니다."""
+    key = (date, ticker)
+    cached = signal_cache.get(key)
+    if cached is not MISSING:
+        return dict(cached) if cached is not None else None
+
+    doc = db.collection(SIGNAL_COLLECTION).document(date).collection(SIGNAL_SUBCOLLECTION).document(ticker).get()
+    result = doc.to_dict() if doc.exists else None
+    signal_cache.set(key, result, ttl=None if result is not None else 60)
+    return dict(result) if result is not None else None
+
+
+def list_signal_dates_before(cutoff_date: str) -> list[str]:
+    """기준일보다 앞선 신호 날짜 목록을 반환합니다.
+
+    요약 문서 없이 종목별 문서만 남은 날짜(신호 저장 중 실패)도 포함하도록 문서 참조만 나열합니다 (필드 데이터는 읽지 않음).
+    """
+    return sorted(doc_ref.id for doc_ref in db.collection(SIGNAL_COLLECTION).list_documents() if doc_ref.id < cutoff_date)
+
+
+def delete_signals(dates: list[str]) -> int:
+    """날짜별 종목 신호 문서와 요약 문서를 WriteBatch 단위로 묶어 삭제하고 삭제한 문서 수를 반환합니다.
+
+    Firestore는 상위 문서를 지워도 하위 컬렉션을 지우지 않으므로 종목별 문서를 먼저 모두 지웁니다.
+    """
+    deleted = 0
+    for date in dates:
+        date_ref = db.collection(SIGNAL_COLLECTION).document(date)
+        signal_refs = list(date_ref.collection(SIGNAL_SUBCOLLECTION).list_documents())
+        for i in range(0, len(signal_refs), MAX_BATCH_OPERATIONS):
+            batch = db.batch()
+            for doc_ref in signal_refs[i:i + MAX_BATCH_OPERATIONS]:
+                batch.delete(doc_ref)
+            batch.commit()
+        date_ref.delete()
+        deleted += len(signal_refs) + 1
+        ranking_cache.invalidate(date)
+    if dates:
+        signal_cache.clear()
+    return deleted
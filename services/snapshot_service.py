@@ -0,0 +1,125 @@
+import argparse
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from database import db
+from routers.holidays import trading_calendar
+from services.firestore_service import TOP100_COLLECTION, invalidate_snapshot
+from services.ohlcv_store import get_market_tables
+from services.stock_service import get_market_ticker_name
+from services.ticker_service import get_name
+from services.trading_calendar import to_yyyymmdd
+
+# 백필 진행 상황(마지막 완료일)을 기록하는 컬렉션
+BACKFILL_COLLECTION = 'snapshot_backfill_jobs'
+# 한 번의 WriteBatch 커밋에 묶는 날짜 수 (문서 1개 ≈ 100개 레코드)
+BACKFILL_CHUNK_DAYS = 20
+
+_backfill_lock = threading.Lock()
+_backfill_status = {"running": False}
+
+
+def build_top100_records(df: pd.DataFrame) -> list[dict]:
+    """전 종목 시세 테이블에서 코스피 거래대금 상위 100종목의 스냅샷 레코드를 만듭니다."""
+    df = df[df['시장'] == 'KOSPI']
+    top = (
+        df.sort_values(by='거래대금', ascending=False)
+        .head(100)
+        .reset_index()[['티커', '거래량', '거래대금']]
+    )
+    top['종목명'] = top['티커'].map(lambda t: get_name(t) or get_market_ticker_name(t))
+    top = top[['종목명', '거래량', '거래대금']]
+    return top.to_dict('records')
+
+
+def get_backfill_status() -> dict:
+    """현재(또는 마지막) 백필 작업의 진행 상황을 반환합니다."""
+    return {key: value for key, value in _backfill_status.items() if not key.startswith('_')}
+
+
+def _update_status(**fields):
+    _backfill_status.update(fields)
+    done = _backfill_status.get("완료일수", 0)
+    elapsed = time.monotonic() - _backfill_status.get("_started_at", time.monotonic())
+    _backfill_status["경과초"] = round(elapsed, 1)
+    _backfill_status["처리속도(일/초)"] = round(done / elapsed, 2) if elapsed > 0 else None
+
+
+def run_backfill(start_date_str: str, end_date_str: str, resume: bool = True) -> dict:
+    """기간 내 모든 영업일의 Top 100 스냅샷을 만들어 WriteBatch로 저장합니다.
+
+    시세는 날짜 묶음 단위로 동시에 받고, 묶음마다 스냅샷 문서와 작업 체크포인트를 한 번에 커밋합니다.
+    resume=True이면 같은 기간의 이전 작업이 마지막으로 완료한 날짜 다음부터 이어서 진행합니다.
+    """
+    if not _backfill_lock.acquire(blocking=False):
+        raise RuntimeError("이미 진행 중인 백필 작업이 있습니다.")
+
+    try:
+        start_date = datetime.strptime(start_date_str, '%Y%m%d').date()
+        end_date = datetime.strptime(end_date_str, '%Y%m%d').date()
+        dates = to_yyyymmdd(trading_calendar.business_days_between(start_date, end_date))
+
+        job_ref = db.collection(BACKFILL_COLLECTION).document(f"{start_date_str}_{end_date_str}")
+        last_completed = None
+        if resume:
+            job_doc = job_ref.get()
+            if job_doc.exists:
+                last_completed = job_doc.to_dict().get('last_completed')
+        if last_completed:
+            dates = [date for date in dates if date > last_completed]
+            print(f"Resuming backfill {start_date_str}~{end_date_str} after {last_completed}.")
+
+        _backfill_status.clear()
+        _backfill_status.update({
+            "running": True,
+            "시작일": start_date_str,
+            "종료일": end_date_str,
+            "재개기준일": last_completed,
+            "대상일수": len(dates),
+            "완료일수": 0,
+            "건너뛴날짜": [],
+            "_started_at": time.monotonic()
+        })
+
+        collection_ref = db.collection(TOP100_COLLECTION)
+        for i in range(0, len(dates), BACKFILL_CHUNK_DAYS):
+            chunk = dates[i:i + BACKFILL_CHUNK_DAYS]
+            tables = get_market_tables(chunk)
+
+            batch = db.batch()
+            written = []
+            for date in chunk:
+                if tables[date].empty:
+                    _backfill_status["건너뛴날짜"].append(date)
+                    continue
+                batch.set(collection_ref.document(date), {'data': build_top100_records(tables[date])})
+                written.append(date)
+            batch.set(job_ref, {'last_completed': chunk[-1], 'updated_at': datetime.now().isoformat()})
+            batch.commit()
+
+            for date in written:
+                invalidate_snapshot(date)
+            _update_status(완료일수=_backfill_status["완료일수"] + len(chunk), 현재일=chunk[-1])
+            print(f"Backfill progress: {_backfill_status['완료일수']}/{len(dates)} days (through {chunk[-1]}).")
+
+        _update_status(running=False)
+        return get_backfill_status()
+    except Exception as e:
+        _update_status(running=False, 오류=str(e))
+        raise
+    finally:
+        _backfill_lock.release()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top 100 스냅샷 일괄 생성(백필)")
+    parser.add_argument("--start", required=True, help="시작일 (YYYYMMDD)")
+    parser.add_argument("--end", required=True, help="종료일 (YYYYMMDD)")
+    parser.add_argument("--no-resume", action="store_true", help="이전 진행 상황을 무시하고 처음부터 실행")
+    args = parser.parse_args()
+
+    result = run_backfill(args.start, args.end, resume=not args.no_resume)
+    print(result)
@@ -1,14 +1,98 @@
-from datetime import datetime, timedelta
-from routers.holidays import is_business_day
+from concurrent.futures import Future
+from datetime import datetime
+
+import pandas as pd
+
+from routers.holidays import trading_calendar
+from services.fetch_scheduler import krx_scheduler
+from services.trading_calendar import to_yyyymmdd
+
+# 시장 전체 스캔 대상 시장 (코넥스 제외)
+MARKETS = ("KOSPI", "KOSDAQ")
+
+
+def get_krx_module():
+    """pykrx.stock 모듈을 반환합니다. import 시 matplotlib 로드와 KRX 로그인을 수행하므로 처음 조회할 때 불러옵니다."""
+    from pykrx import stock
+    return stock
 
 
 def get_previous_business_days(n: int, end_date_str: str) -> list[str]:
     """주어진 종료 날짜 이전의 n개 영업일(주말 및 공휴일 제외) 리스트를 반환합니다."""
-    business_days = []
-    current_date = datetime.strptime(end_date_str, '%Y%m%d').date() # date 객체 사용
-
-    while len(business_days) < n:
-        current_date -= timedelta(days=1)
-        if is_business_day(current_date):
-            business_days.append(current_date.strftime('%Y%m%d'))
-    return business_days
\ No newline at end of file
+    end_date = datetime.strptime(end_date_str, '%Y%m%d').date() # date 객체 사용
+    return to_yyyymmdd(trading_calendar.previous_business_days(n, end_date))
+
+
+def get_business_days_between(start_date_str: str, end_date_str: str) -> list[str]:
+    """시작일과 종료일(모두 포함) 사이의 영업일 리스트를 오름차순으로 반환합니다."""
+    start_date = datetime.strptime(start_date_str, '%Y%m%d').date()
+    end_date = datetime.strptime(end_date_str, '%Y%m%d').date()
+    return to_yyyymmdd(trading_calendar.business_days_between(start_date, end_date))
+
+
+def get_market_ohlcv(ticker: str, fromdate: str, todate: str) -> pd.DataFrame:
+    """단일 종목의 기간별 OHLCV를 조회합니다 (같은 구간의 동시 요청은 한 번만 조회)."""
+    df = krx_scheduler.call(
+        ('get_market_ohlcv', ticker, fromdate, todate),
+        get_krx_module().get_market_ohlcv, fromdate=fromdate, todate=todate, ticker=ticker
+    )
+    # 동시 요청이 같은 결과를 공유하므로 호출자별 사본을 반환합니다.
+    return df.copy()
+
+
+def get_market_ticker_name(ticker: str) -> str:
+    """티커의 종목명을 조회합니다."""
+    return krx_scheduler.call(('get_market_ticker_name', ticker), get_krx_module().get_market_ticker_name, ticker)
+
+
+def _submit_market_tables(date: str) -> dict[str, Future]:
+    return {
+        market: krx_scheduler.submit(
+            ('get_market_ohlcv_by_ticker', date, market),
+            get_krx_module().get_market_ohlcv_by_ticker, date, market=market
+        )
+        for market in MARKETS
+    }
+
+
+def _combine_market_tables(futures: dict[str, Future]) -> pd.DataFrame:
+    frames = []
+    for market, future in futures.items():
+        df = future.result()
+        if df.empty:
+            continue
+        df = df.copy()
+        df['시장'] = market
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames)
+
+
+def get_market_ohlcv_all(date: str) -> pd.DataFrame:
+    """지정된 날짜의 코스피·코스닥 전 종목 OHLCV를 '시장' 컬럼과 함께 하나의 테이블로 반환합니다."""
+    return _combine_market_tables(_submit_market_tables(date))
+
+
+def get_market_ohlcv_all_many(dates: list[str]) -> dict[str, pd.DataFrame]:
+    """여러 날짜의 전 종목 OHLCV를 공유 스케줄러에서 동시에 조회합니다."""
+    futures = {date: _submit_market_tables(date) for date in dates}
+    return {date: _combine_market_tables(date_futures) for date, date_futures in futures.items()}
+
+
+def get_ticker_names(date: str) -> dict[str, str]:
+    """지정된 날짜의 코스피·코스닥 전 종목 티커-종목명 매핑을 시장별 일괄 조회로 가져옵니다."""
+    futures = [
+        krx_scheduler.submit(
+            ('get_market_price_change_by_ticker', date, market),
+            get_krx_module().get_market_price_change_by_ticker, date, date, market=market
+        )
+        for market in MARKETS
+    ]
+    names = {}
+    for future in futures:
+        df = future.result()
+        if df.empty:
+            continue
+        names.update(df['종목명'].to_dict())
+    return names
@@ -0,0 +1,53 @@
+import json
+from typing import Callable, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+
+# 스트리밍 응답 형식별 media type
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _json_default(value):
+    """numpy 스칼라 등 json이 모르는 값을 파이썬 값으로 변환합니다."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+def _encode(event: str, data: dict, fmt: str) -> str:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {_dumps(data)}\n\n"
+    if event == "result":
+        return _dumps(data) + "\n"
+    return _dumps({event: data}) + "\n"
+
+
+def _iter_events(records: Iterable[dict], summary: Callable[[], dict], fmt: str) -> Iterator[str]:
+    try:
+        for record in records:
+            yield _encode("result", record, fmt)
+    except Exception as e:
+        # 응답이 이미 시작되어 상태 코드를 바꿀 수 없으므로 오류를 마지막 레코드로 알립니다.
+        print(f"Error while streaming results: {e}")
+        yield _encode("error", {"detail": f"결과 생성 중 오류 발생: {e}"}, fmt)
+        return
+    yield _encode("summary", summary(), fmt)
+
+
+def stream_records(records: Iterable[dict], summary: Callable[[], dict], fmt: str) -> StreamingResponse:
+    """레코드를 계산되는 대로 NDJSON 또는 SSE로 내보내고 마지막에 요약 레코드를 보냅니다.
+
+    - ndjson: 레코드마다 한 줄, 마지막 줄은 {"summary": {...}} (오류 시 {"error": {...}})
+    - sse: 레코드마다 event: result, 마지막은 event: summary (오류 시 event: error)
+
+    summary는 records를 모두 내보낸 뒤에 호출되므로 집계 값을 반환할 수 있습니다.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_iter_events(records, summary, fmt), media_type=STREAM_MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from routers.holidays import trading_calendar
+from services.stock_service import get_ticker_names
+
+# 티커 인덱스 파일 ({"version": YYYYMMDD, "tickers": {티커: 종목명}})
+TICKER_INDEX_PATH = os.getenv(
+    'TICKER_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ticker_index.json')
+)
+# 인덱스 생성·갱신이 실패했을 때 다시 시도하기까지의 최소 간격(초)
+REFRESH_RETRY_SECONDS = 30 * 60
+
+_lock = threading.Lock()
+_load_lock = threading.Lock()
+_version = None
+_name_by_ticker = {}
+_ticker_by_name = {}
+_refresh_thread = None
+_last_refresh_attempt = float('-inf')
+
+
+def _latest_business_day() -> str:
+    """오늘 또는 가장 최근 영업일을 YYYYMMDD 문자열로 반환합니다."""
+    return trading_calendar.nearest_business_day(datetime.today().date()).strftime('%Y%m%d')
+
+
+def _apply(version: str, name_by_ticker: dict[str, str]):
+    global _version, _name_by_ticker, _ticker_by_name
+    ticker_by_name = {name: ticker for ticker, name in name_by_ticker.items() if name}
+    with _lock:
+        _version = version
+        _name_by_ticker = name_by_ticker
+        _ticker_by_name = ticker_by_name
+
+
+def _load_from_file() -> bool:
+    """저장된 티커 인덱스 파일을 읽어 메모리에 적재합니다."""
+    if not os.path.exists(TICKER_INDEX_PATH):
+        return False
+    try:
+        with open(TICKER_INDEX_PATH, encoding='utf-8') as f:
+            saved = json.load(f)
+        _apply(saved['version'], saved['tickers'])
+        print(f"Ticker index {saved['version']} loaded from file with {len(_name_by_ticker)} entries.")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not read ticker index file {TICKER_INDEX_PATH}: {e}")
+        return False
+
+
+def refresh_ticker_index(date: str | None = None) -> int:
+    """지정된 날짜(기본: 최근 영업일)의 시장 스냅샷으로 티커 인덱스를 다시 만들고 파일로 저장합니다."""
+    version = date or _latest_business_day()
+    name_by_ticker = get_ticker_names(version)
+    if not name_by_ticker:
+        raise ValueError(f"{version}의 종목 목록이 비어 있습니다.")
+
+    os.makedirs(os.path.dirname(TICKER_INDEX_PATH), exist_ok=True)
+    # 동시에 갱신하는 요청끼리 임시 파일이 겹치지 않도록 저장마다 고유한 임시 파일을 씁니다.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(TICKER_INDEX_PATH), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'tickers': name_by_ticker}, f, ensure_ascii=False)
+        os.replace(tmp_path, TICKER_INDEX_PATH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _apply(version, name_by_ticker)
+    print(f"Ticker index {version} built with {len(name_by_ticker)} entries.")
+    return len(name_by_ticker)
+
+
+def _claim_refresh_attempt() -> bool:
+    """마지막 시도 후 REFRESH_RETRY_SECONDS가 지났으면 이번 시도를 기록하고 True를 반환합니다."""
+    global _last_refresh_attempt
+    now = time.monotonic()
+    if now - _last_refresh_attempt < REFRESH_RETRY_SECONDS:
+        return False
+    _last_refresh_attempt = now
+    return True
+
+
+def _refresh_in_background():
+    global _refresh_thread
+    if _refresh_thread is not None and _refresh_thread.is_alive():
+        return
+    if not _claim_refresh_attempt():
+        return
+
+    def run():
+        try:
+            refresh_ticker_index()
+        except Exception as e:
+            print(f"Warning: Background ticker index refresh failed: {e}")
+
+    _refresh_thread = threading.Thread(target=run, name="ticker-index-refresh", daemon=True)
+    _refresh_thread.start()
+
+
+def _ensure_loaded():
+    """최초 사용 시 티커 인덱스를 적재하고, 최근 영업일보다 오래되었으면 백그라운드에서 갱신합니다.
+
+    저장된 인덱스 파일이 있으면 오래되었더라도 먼저 사용합니다. 파일이 없어 직접 만들다 실패하면
+    REFRESH_RETRY_SECONDS 동안은 요청마다 다시 만들지 않습니다 (그 사이 다른 프로세스가 저장한 파일은 읽습니다).
+    """
+    if _version is None:
+        with _load_lock:
+            if _version is None and not _load_from_file():
+                if not _claim_refresh_attempt():
+                    return
+                try:
+                    refresh_ticker_index()
+                except Exception as e:
+                    print(f"Fatal Error: Failed to build ticker index: {e}")
+                    return
+    if _version < _latest_business_day():
+        _refresh_in_background()
+
+
+def get_ticker(name: str) -> str | None:
+    """종목명으로 티커를 조회합니다."""
+    _ensure_loaded()
+    return _ticker_by_name.get(name)
+
+
+def get_name(ticker: str) -> str | None:
+    """티커로 종목명을 조회합니다."""
+    _ensure_loaded()
+    return _name_by_ticker.get(ticker)
+
+
+def load_ticker_map() -> dict[str, str]:
+    """코스피, 코스닥 모든 종목의 종목명-티커 매핑을 로드하여 반환합니다."""
+    _ensure_loaded()
+    return _ticker_by_name
+
+
+def get_ticker_index_status() -> dict:
+    """티커 인덱스의 버전과 항목 수를 반환합니다."""
+    return {"version": _version, "종목수": len(_name_by_ticker)}
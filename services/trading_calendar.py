@@ -0,0 +1,100 @@
+import threading
+from datetime import date as DateObject, timedelta
+from typing import Callable, Iterable
+
+import numpy as np
+
+from services.metrics_service import span
+
+
+def to_yyyymmdd(days: Iterable[np.datetime64]) -> list[str]:
+    """datetime64[D] 배열을 YYYYMMDD 문자열 리스트로 변환합니다."""
+    return [str(day).replace('-', '') for day in days]
+
+
+class TradingCalendar:
+    """연도별 영업일을 정렬된 datetime64[D] 배열로 미리 계산해 두고 이진 탐색으로 조회하는 영업일 달력.
+
+    holiday_provider(year)는 해당 연도의 휴장일(공휴일 + 사용자 지정 공휴일) 집합을 반환해야 합니다.
+    """
+
+    def __init__(self, holiday_provider: Callable[[int], Iterable[DateObject]]):
+        self._holiday_provider = holiday_provider
+        self._years: dict[int, np.ndarray] = {}
+        self._days = np.array([], dtype='datetime64[D]')
+        self._lock = threading.Lock()
+
+    def _build_year(self, year: int) -> np.ndarray:
+        days = np.arange(np.datetime64(f'{year:04d}-01-01'), np.datetime64(f'{year + 1:04d}-01-01'), dtype='datetime64[D]')
+        holidays = np.array(sorted(self._holiday_provider(year)), dtype='datetime64[D]')
+        return days[np.is_busday(days, holidays=holidays)]
+
+    def _concat(self):
+        self._days = np.concatenate([self._years[year] for year in sorted(self._years)])
+
+    def _ensure_years(self, first_year: int, last_year: int):
+        """지정된 연도 범위의 영업일이 모두 계산되어 있도록 합니다."""
+        missing = [year for year in range(first_year, last_year + 1) if year not in self._years]
+        if not missing:
+            return
+        with self._lock:
+            built = False
+            for year in missing:
+                if year not in self._years:
+                    self._years[year] = self._build_year(year)
+                    built = True
+            if built:
+                self._concat()
+
+    def invalidate_year(self, year: int):
+        """휴장일이 바뀐 연도만 다시 계산합니다. 아직 계산되지 않은 연도는 무시합니다."""
+        with self._lock:
+            if year not in self._years:
+                return
+            self._years[year] = self._build_year(year)
+            self._concat()
+        print(f"Trading calendar for year {year} rebuilt.")
+
+    def is_business_day(self, target_date: DateObject) -> bool:
+        """주어진 날짜가 영업일인지 확인합니다."""
+        self._ensure_years(target_date.year, target_date.year)
+        day = np.datetime64(target_date, 'D')
+        days = self._days
+        idx = np.searchsorted(days, day)
+        return bool(idx < len(days) and days[idx] == day)
+
+    def nearest_business_day(self, target_date: DateObject) -> DateObject:
+        """주어진 날짜 당일 또는 그 이전의 가장 가까운 영업일을 반환합니다."""
+        return self.previous_business_days(1, target_date, inclusive=True)[0].astype(DateObject)
+
+    @span("calendar.previous_business_days")
+    def previous_business_days(self, n: int, end_date: DateObject, inclusive: bool = False) -> np.ndarray:
+        """종료일 이전(inclusive=True면 종료일 포함)의 n개 영업일을 최근 날짜부터 내림차순으로 반환합니다."""
+        if n <= 0:
+            return np.array([], dtype='datetime64[D]')
+
+        end = np.datetime64(end_date, 'D')
+        # 영업일은 달력일의 약 2/3이므로 여유 있게 잡은 뒤 부족하면 한 해씩 더 거슬러 올라갑니다.
+        first_year = (end_date - timedelta(days=n * 2 + 14)).year
+        while True:
+            self._ensure_years(first_year, end_date.year)
+            days = self._days
+            idx = np.searchsorted(days, end, side='right' if inclusive else 'left')
+            if idx >= n or first_year <= 1:
+                return days[max(idx - n, 0):idx][::-1]
+            first_year -= 1
+
+    @span("calendar.business_days_between")
+    def business_days_between(self, start_date: DateObject, end_date: DateObject) -> np.ndarray:
+        """시작일과 종료일(모두 포함) 사이의 영업일을 오름차순으로 반환합니다."""
+        if start_date > end_date:
+            return np.array([], dtype='datetime64[D]')
+        self._ensure_years(start_date.year, end_date.year)
+        days = self._days
+        lo = np.searchsorted(days, np.datetime64(start_date, 'D'), side='left')
+        hi = np.searchsorted(days, np.datetime64(end_date, 'D'), side='right')
+        return days[lo:hi]
+
+    def count_business_days(self, start_date: DateObject, end_date: DateObject) -> int:
+        """시작일과 종료일(모두 포함) 사이의 영업일 수를 반환합니다."""
+        return len(self.business_days_between(start_date, end_date))
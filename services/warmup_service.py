@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from services.metrics_service import span
+
+
+def _warm_firestore():
+    from database import db
+    db.initialize()
+
+
+def _warm_holidays():
+    # 다른 워커의 등록을 반영하도록 스냅샷 리스너를 먼저 붙인 뒤 사용자 지정 공휴일 전체를 한 번에 읽습니다.
+    # (읽기가 실패해도 리스너가 연결되는 대로 채워지며, 이 단계는 성공할 때까지 다시 시도됩니다.)
+    from routers.holidays import load_custom_holidays, start_holiday_listener
+    start_holiday_listener()
+    load_custom_holidays()
+
+
+def _warm_calendar():
+    # 올해와 작년의 휴장일(공휴일 + Firestore 사용자 지정 공휴일)을 읽어 영업일 달력을 미리 계산합니다.
+    from routers.holidays import trading_calendar
+    trading_calendar.previous_business_days(250, datetime.today().date(), inclusive=True)
+
+
+def _warm_ticker_index():
+    from services.ticker_service import load_ticker_map
+    load_ticker_map()
+
+
+def _warm_krx():
+    # pykrx import(및 KRX 로그인)를 첫 시세 조회 전에 끝내 둡니다.
+    from services.stock_service import get_krx_module
+    get_krx_module()
+
+
+# 앱 시작 후 백그라운드에서 순서대로 실행하는 준비 단계
+WARMUP_STAGES: list[tuple[str, Callable[[], None]]] = [
+    ("firestore", _warm_firestore),
+    ("holidays", _warm_holidays),
+    ("calendar", _warm_calendar),
+    ("ticker_index", _warm_ticker_index),
+    ("krx", _warm_krx),
+]
+
+# 실패한 준비 단계를 다시 시도하기 전 대기 시간(초). 실패할 때마다 두 배로 늘리되 최대값을 넘지 않습니다.
+WARMUP_RETRY_INITIAL_SECONDS = 5
+WARMUP_RETRY_MAX_SECONDS = 300
+
+_status = {name: {"state": "pending", "attempts": 0} for name, _ in WARMUP_STAGES}
+_first_pass_done = False
+_lock = threading.Lock()
+_thread = None
+
+
+def _run_stage(name: str, stage: Callable[[], None]) -> bool:
+    """준비 단계 하나를 실행하고 상태를 기록합니다. 성공하면 True를 반환합니다."""
+    with _lock:
+        attempts = _status[name]["attempts"] + 1
+        _status[name] = {"state": "running", "attempts": attempts}
+    started_at = time.perf_counter()
+    try:
+        with span(f"warmup.{name}"):
+            stage()
+        result = {"state": "done", "attempts": attempts}
+    except Exception as e:
+        print(f"Warning: Warm-up stage '{name}' failed (attempt {attempts}): {e}")
+        result = {"state": "failed", "attempts": attempts, "error": str(e)}
+    result["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+    with _lock:
+        _status[name] = result
+    print(f"Warm-up stage '{name}' {result['state']} in {result['elapsed_ms']}ms.")
+    return result["state"] == "done"
+
+
+def _run_stages():
+    global _first_pass_done
+    failed = [(name, stage) for name, stage in WARMUP_STAGES if not _run_stage(name, stage)]
+    with _lock:
+        _first_pass_done = True
+
+    # 시작 시 KRX나 Firestore에 접속할 수 없었던 단계는 프로세스를 다시 시작하지 않아도 복구되도록 계속 다시 시도합니다.
+    delay = WARMUP_RETRY_INITIAL_SECONDS
+    while failed:
+        with _lock:
+            for name, _ in failed:
+                _status[name]["next_retry_seconds"] = delay
+        time.sleep(delay)
+        failed = [(name, stage) for name, stage in failed if not _run_stage(name, stage)]
+        delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+
+def start_warmup() -> threading.Thread:
+    """준비 단계를 백그라운드 스레드에서 시작합니다. 이미 진행 중이면 그 스레드를 반환합니다."""
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run_stages, name="app-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def get_readiness() -> dict:
+    """준비 단계별 상태와 전체 준비 완료 여부를 반환합니다.
+
+    모든 단계를 한 번씩 시도하면 준비 완료로 보고, 실패해 다시 시도 중인 단계가 있으면 degraded로 표시합니다.
+    """
+    with _lock:
+        stages = {name: dict(status) for name, status in _status.items()}
+        first_pass_done = _first_pass_done
+    return {
+        "ready": first_pass_done,
+        "degraded": any(status["state"] != "done" for status in stages.values()) if first_pass_done else False,
+        "stages": stages
+    }